@@ -44,6 +44,7 @@ def create_task(
 	depth: Optional[int] = None,
 	max_links: Optional[int] = None,
 	timeout: int = 15,
+	engine: Optional[str] = None,
 ) -> Dict[str, Any]:
 	"""
 	调用 /api/tasks/crawl 创建单个任务。
@@ -58,6 +59,8 @@ def create_task(
 		payload["depth"] = depth
 	if isinstance(max_links, int):
 		payload["max_links"] = max_links
+	if engine:
+		payload["engine"] = engine
 
 	try:
 		resp = session.post(url, json=payload, timeout=timeout)
@@ -205,6 +208,12 @@ def main():
 		default=1,
 		help="最多处理的网站数，0 表示不限制",
 	)
+	parser.add_argument(
+		"--engine",
+		choices=["recursive", "async"],
+		default="async",
+		help="爬取引擎（async 为并发引擎）",
+	)
 	# 新增：等待模式与参数
 	parser.add_argument(
 		"--wait",
@@ -233,7 +242,7 @@ def main():
 		print("未找到可用网站（active），退出。")
 		return
 
-	print(f"准备创建任务：{len(websites)} 个网站，策略={args.strategy}，并发={args.concurrency}")
+	print(f"准备创建任务：{len(websites)} 个网站，策略={args.strategy}，引擎={args.engine}，并发={args.concurrency}")
 
 	ok, skipped, failed = 0, 0, 0
 	results: List[Dict[str, Any]] = []
@@ -252,6 +261,7 @@ def main():
 					args.strategy,
 					site.get("crawl_depth"),
 					site.get("max_links"),
+					engine=args.engine,
 				)
 				if res["success"]:
 					ok += 1
@@ -306,6 +316,7 @@ def main():
 					1,
 					# site.get("crawl_depth"),
 					site.get("max_links"),
+					engine=args.engine,
 				): site
 				for site in websites
 			}
@@ -4,22 +4,13 @@
 from flask import request
 from bson import ObjectId
 from bson.errors import InvalidId
-import threading
 
 from . import tasks_bp
 from ..database import get_db
-from ..models import CrawlTaskModel
+from ..models import CrawlTaskModel, WebsiteModel
 from ..utils import success_response, error_response, paginate_response
-from ..services.crawler_service import CrawlerService
-
-
-def run_crawler_task(task_id, website_id, strategy, depth, max_links):
-    """在后台线程中运行爬虫任务"""
-    try:
-        crawler = CrawlerService()
-        crawler.crawl(task_id, website_id, strategy, depth, max_links)
-    except Exception as e:
-        print(f"爬虫任务执行失败: {str(e)}")
+from ..utils.validators import parse_number
+from ..services.task_queue import enqueue_task
 
 
 @tasks_bp.route('/crawl', methods=['POST'])
@@ -35,6 +26,8 @@ def create_crawl_task():
             return error_response('爬取策略不能为空')
         if data['strategy'] not in ['incremental', 'full']:
             return error_response('策略必须是 incremental 或 full')
+        if data.get('engine') and data['engine'] not in ['recursive', 'async']:
+            return error_response('爬取引擎必须是 recursive 或 async')
 
         db = get_db()
         website_id = ObjectId(data['website_id'])
@@ -44,46 +37,51 @@ def create_crawl_task():
         if not website:
             return error_response('网站不存在', 404)
 
-        # 检查是否有正在运行的任务
+        # 检查是否有排队中或正在运行的任务
         running_task = db.crawl_tasks.find_one({
             'website_id': website_id,
-            'status': 'running'
+            'status': {'$in': ['pending', 'running']}
         })
         if running_task:
-            return error_response('该网站已有正在运行的任务', 409)
-
-        # 创建任务文档
-        task_doc = CrawlTaskModel.create(
-            website_id=website_id,
-            strategy=data['strategy'],
-            task_type='manual'
-        )
-
-        # 插入数据库
-        result = db.crawl_tasks.insert_one(task_doc)
-        task_id = result.inserted_id
-        task_doc['_id'] = task_id
-
-        # 获取爬取参数
-        depth = data.get('depth', website.get('crawl_depth', 3))
-        max_links = data.get('max_links', website.get('max_links', 1000))
-
-        # 在后台线程中启动爬取任务
-        thread = threading.Thread(
-            target=run_crawler_task,
-            args=(task_id, website_id, data['strategy'], depth, max_links)
+            return error_response('该网站已有排队中或正在运行的任务', 409)
+
+        # 获取爬取引擎与参数（请求参数优先，其次使用网站默认配置），按网站配置的规则校验
+        engine = data.get('engine') or website.get('crawl_engine', 'recursive')
+        concurrency = website.get('crawl_concurrency', 20)
+        if 'concurrency' in data:
+            concurrency = parse_number(data, 'concurrency', int)
+        depth = website.get('crawl_depth', 3)
+        if 'depth' in data:
+            depth = parse_number(data, 'depth', int)
+        max_links = website.get('max_links', 1000)
+        if 'max_links' in data:
+            max_links = parse_number(data, 'max_links', int)
+        is_valid, error_msg = WebsiteModel.validate(dict(
+            website, crawl_engine=engine, crawl_concurrency=concurrency, crawl_depth=depth, max_links=max_links
+        ))
+        if not is_valid:
+            return error_response(error_msg)
+
+        # 加入任务队列，由 worker 认领执行
+        task_doc = enqueue_task(
+            db, website_id, data['strategy'],
+            task_type='manual',
+            engine=engine,
+            depth=depth,
+            max_links=max_links,
+            concurrency=concurrency
         )
-        thread.daemon = True
-        thread.start()
 
         return success_response(
             CrawlTaskModel.to_dict(task_doc),
-            '爬取任务已创建并开始执行',
+            '爬取任务已加入队列',
             202
         )
 
     except InvalidId:
         return error_response('网站ID格式无效', 400)
+    except ValueError as e:
+        return error_response(str(e))
     except Exception as e:
         return error_response(f'创建爬取任务失败: {str(e)}', 500)
 
@@ -206,11 +204,11 @@ def cancel_task(task_id):
         if not task:
             return error_response('任务不存在', 404)
 
-        # 只能取消运行中的任务
-        if task['status'] != 'running':
-            return error_response(f'只能取消运行中的任务，当前状态: {task["status"]}', 400)
+        # 只能取消排队中或运行中的任务
+        if task['status'] not in ['pending', 'running']:
+            return error_response(f'只能取消排队中或运行中的任务，当前状态: {task["status"]}', 400)
 
-        # 设置停止标志（通知后台任务停止）
+        # 设置停止标志（通知本进程中的任务停止；其他进程中的 worker 通过心跳发现取消状态）
         from ..global_vars import set_stop_flag
         set_stop_flag(task_id)
 
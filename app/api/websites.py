@@ -12,6 +12,8 @@ from . import websites_bp
 from ..database import get_db
 from ..models import WebsiteModel
 from ..utils import success_response, error_response, paginate_response, validate_url
+from ..utils.validators import parse_number
+from ..services.url_canonical import validate_url_rules
 
 
 @websites_bp.route('', methods=['POST'])
@@ -31,6 +33,9 @@ def create_website():
         if not is_valid:
             return error_response(msg)
 
+        if data.get('crawl_engine', 'recursive') not in ['recursive', 'async']:
+            return error_response('爬取引擎必须是 recursive 或 async')
+
         # 提取域名
         parsed_url = urlparse(data['url'])
         domain = parsed_url.netloc
@@ -47,8 +52,13 @@ def create_website():
             url=data['url'],
             domain=domain,
             crawl_depth=data.get('crawl_depth', 3),
-            max_links=data.get('max_links', 1000)
+            max_links=data.get('max_links', 1000),
+            crawl_engine=data.get('crawl_engine', 'recursive'),
+            crawl_concurrency=data.get('crawl_concurrency', 20)
         )
+        is_valid, msg = WebsiteModel.validate(website_doc)
+        if not is_valid:
+            return error_response(msg)
 
         # 插入数据库
         result = db.websites.insert_one(website_doc)
@@ -136,9 +146,53 @@ def update_website(website_id):
                 return error_response('状态必须是 active 或 inactive')
             update_data['status'] = data['status']
         if 'crawl_depth' in data:
-            update_data['crawl_depth'] = int(data['crawl_depth'])
+            update_data['crawl_depth'] = parse_number(data, 'crawl_depth', int)
         if 'max_links' in data:
-            update_data['max_links'] = int(data['max_links'])
+            update_data['max_links'] = parse_number(data, 'max_links', int)
+        if 'crawl_engine' in data:
+            if data['crawl_engine'] not in ['recursive', 'async']:
+                return error_response('爬取引擎必须是 recursive 或 async')
+            update_data['crawl_engine'] = data['crawl_engine']
+        if 'crawl_concurrency' in data:
+            update_data['crawl_concurrency'] = parse_number(data, 'crawl_concurrency', int)
+        if 'link_validation' in data:
+            if data['link_validation'] not in ['get', 'head']:
+                return error_response('链接校验方式必须是 get 或 head')
+            update_data['link_validation'] = data['link_validation']
+        if 'max_body_bytes' in data:
+            update_data['max_body_bytes'] = parse_number(data, 'max_body_bytes', int)
+        if 'parse_workers' in data:
+            update_data['parse_workers'] = parse_number(data, 'parse_workers', int)
+        for key in ('request_timeout_min', 'request_timeout_max'):
+            if key in data:
+                update_data[key] = parse_number(data, key, float)
+        for key in ('fetch_max_retries', 'breaker_threshold'):
+            if key in data:
+                update_data[key] = parse_number(data, key, int)
+        if 'host_max_concurrency' in data:
+            update_data['host_max_concurrency'] = parse_number(data, 'host_max_concurrency', int)
+        if 'host_min_delay' in data:
+            update_data['host_min_delay'] = parse_number(data, 'host_min_delay', float)
+        # 爬取预算（null 表示不限制）
+        for key in ('max_pages', 'max_crawl_bytes'):
+            if key in data:
+                update_data[key] = parse_number(data, key, int, nullable=True)
+        if 'max_crawl_seconds' in data:
+            update_data['max_crawl_seconds'] = parse_number(data, 'max_crawl_seconds', float, nullable=True)
+        if 'use_sitemap' in data:
+            update_data['use_sitemap'] = bool(data['use_sitemap'])
+        if 'sitemap_ttl' in data:
+            update_data['sitemap_ttl'] = parse_number(data, 'sitemap_ttl', int)
+        if 'url_rules' in data:
+            is_valid, msg = validate_url_rules(data['url_rules'])
+            if not is_valid:
+                return error_response(msg)
+            update_data['url_rules'] = data['url_rules']
+
+        # 按合并后的配置整体校验（如超时下限不能大于上限）
+        is_valid, msg = WebsiteModel.validate(dict(website, **update_data))
+        if not is_valid:
+            return error_response(msg)
 
         # 更新数据库
         db.websites.update_one(
@@ -156,6 +210,8 @@ def update_website(website_id):
 
     except InvalidId:
         return error_response('网站ID格式无效', 400)
+    except ValueError as e:
+        return error_response(str(e))
     except Exception as e:
         return error_response(f'更新网站失败: {str(e)}', 500)
 
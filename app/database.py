@@ -80,6 +80,8 @@ class Database:
             crawl_tasks.create_index('status')
             crawl_tasks.create_index('started_at')
             crawl_tasks.create_index([('website_id', 1), ('started_at', -1)])
+            crawl_tasks.create_index([('status', 1), ('heartbeat_at', 1)])
+            crawl_tasks.create_index([('status', 1), ('queued_at', 1)])
 
             # crawled_links 集合索引
             crawled_links = self.db.crawled_links
@@ -101,6 +103,20 @@ class Database:
             schedules.create_index('is_active')
             schedules.create_index('next_run_time')
 
+            # seen_filters 集合索引
+            seen_filters = self.db.seen_filters
+            seen_filters.create_index('website_id', unique=True)
+
+            # sitemap_cache 集合索引
+            sitemap_cache = self.db.sitemap_cache
+            sitemap_cache.create_index('website_id', unique=True)
+            sitemap_entries = self.db.sitemap_entries
+            sitemap_entries.create_index([('website_id', 1), ('fetched_at', 1), ('index', 1)])
+
+            # crawl_checkpoints 集合索引
+            crawl_checkpoints = self.db.crawl_checkpoints
+            crawl_checkpoints.create_index('task_id', unique=True)
+
             logger.info("数据库索引创建完成")
 
         except Exception as e:
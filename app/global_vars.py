@@ -1,14 +1,22 @@
 """
 全局变量和资源管理
 """
+import threading
 
 # 全局浏览器实例（延迟初始化）
 driver = None
 
-# 任务停止标志字典 {task_id: should_stop}
+# 任务停止标志字典 {task_id: StopEvent}
 stop_flags = {}
 
 
+class StopEvent(threading.Event):
+    """任务停止信号：可直接作为 should_stop 回调调用，也可用 wait 等待（取消时立即返回）"""
+
+    def __call__(self):
+        return self.is_set()
+
+
 def init_driver():
     """初始化无头浏览器（Selenium/Chrome）"""
     global driver
@@ -53,21 +61,27 @@ def get_driver():
     return driver
 
 
+def get_stop_event(task_id):
+    """获取任务的停止信号（不存在时创建）"""
+    global stop_flags
+    return stop_flags.setdefault(str(task_id), StopEvent())
+
+
 def set_stop_flag(task_id):
     """设置任务停止标志"""
-    global stop_flags
-    stop_flags[str(task_id)] = True
+    get_stop_event(task_id).set()
 
 
-def clear_stop_flag(task_id):
-    """清除任务停止标志"""
+def clear_stop_flag(task_id, event=None):
+    """清除任务停止标志（传入 event 时只在任务当前的停止信号仍是它时清除）"""
     global stop_flags
     task_key = str(task_id)
-    if task_key in stop_flags:
+    if task_key in stop_flags and (event is None or stop_flags[task_key] is event):
         del stop_flags[task_key]
 
 
 def should_stop(task_id):
     """检查任务是否应该停止"""
     global stop_flags
-    return stop_flags.get(str(task_id), False)
+    event = stop_flags.get(str(task_id))
+    return event is not None and event.is_set()
@@ -6,11 +6,17 @@ from .crawl_task import CrawlTaskModel
 from .crawled_link import CrawledLinkModel
 from .crawl_log import CrawlLogModel
 from .schedule import ScheduleModel
+from .seen_filter import SeenFilterModel
+from .sitemap_cache import SitemapCacheModel
+from .crawl_checkpoint import CrawlCheckpointModel
 
 __all__ = [
     'WebsiteModel',
     'CrawlTaskModel',
     'CrawledLinkModel',
     'CrawlLogModel',
-    'ScheduleModel'
+    'ScheduleModel',
+    'SeenFilterModel',
+    'SitemapCacheModel',
+    'CrawlCheckpointModel'
 ]
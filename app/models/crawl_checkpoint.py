@@ -0,0 +1,83 @@
+"""
+爬取检查点模型
+"""
+from datetime import datetime
+from typing import Dict, Any
+from bson import ObjectId, Binary
+
+
+class CrawlCheckpointModel:
+    """运行中任务的遍历进度（每个任务一个文档，任务结束后删除）"""
+
+    COLLECTION_NAME = 'crawl_checkpoints'
+
+    @staticmethod
+    def create(task_id: ObjectId, website_id: ObjectId, params: Dict[str, Any],
+               runner_id: str) -> Dict[str, Any]:
+        """
+        创建检查点文档
+
+        Args:
+            task_id: 任务ID
+            website_id: 网站ID
+            params: 任务参数 (strategy/depth/max_links/engine/concurrency)
+            runner_id: 持有该任务的租约标识（只有它能更新或删除检查点）
+
+        Returns:
+            检查点文档字典
+        """
+        return {
+            'task_id': task_id,
+            'website_id': website_id,
+            'runner_id': runner_id,
+            'params': params,
+            'state': None,
+            'level': 0,
+            'frontier_size': 0,
+            'links': 0,
+            'created_at': datetime.utcnow(),
+            'updated_at': datetime.utcnow()
+        }
+
+    @staticmethod
+    def update_state(state: Binary, level: int, frontier_size: int,
+                     links: int) -> Dict[str, Any]:
+        """
+        生成保存遍历进度的更新文档
+
+        Args:
+            state: 压缩后的遍历状态
+            level: 当前层
+            frontier_size: 当前层剩余待抓取的 url 数
+            links: 已发现的链接数
+
+        Returns:
+            MongoDB 更新操作符字典
+        """
+        return {
+            '$set': {
+                'state': state,
+                'level': level,
+                'frontier_size': frontier_size,
+                'links': links,
+                'updated_at': datetime.utcnow()
+            }
+        }
+
+    @staticmethod
+    def take_over(runner_id: str) -> Dict[str, Any]:
+        """
+        重新认领任务的 worker 接管检查点（此后原进程的保存与删除不再生效）
+
+        Args:
+            runner_id: 新的租约标识
+
+        Returns:
+            MongoDB 更新操作符字典
+        """
+        return {
+            '$set': {
+                'runner_id': runner_id,
+                'updated_at': datetime.utcnow()
+            }
+        }
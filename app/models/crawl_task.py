@@ -13,14 +13,17 @@ class CrawlTaskModel:
 
     @staticmethod
     def create(website_id: ObjectId, strategy: str,
-               task_type: str = 'manual') -> Dict[str, Any]:
+               task_type: str = 'manual', engine: str = 'recursive',
+               params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        创建爬取任务文档
+        创建爬取任务文档（状态为 pending，即进入任务队列）
 
         Args:
             website_id: 网站ID
             strategy: 爬取策略 (incremental/full)
             task_type: 任务类型 (scheduled/manual)
+            engine: 爬取引擎 (recursive/async)
+            params: 执行参数 (depth/max_links/concurrency)，由 worker 读取
 
         Returns:
             任务文档字典
@@ -29,7 +32,10 @@ class CrawlTaskModel:
             'website_id': website_id,
             'task_type': task_type,
             'strategy': strategy,
+            'engine': engine,
             'status': 'pending',
+            'params': params or {},
+            'queued_at': datetime.utcnow(),
             'started_at': None,
             'completed_at': None,
             'statistics': {
@@ -66,9 +72,60 @@ class CrawlTaskModel:
         update_data.update(kwargs)
         return {'$set': update_data}
 
+    @staticmethod
+    def claim(runner_id: str) -> Dict[str, Any]:
+        """
+        worker 认领队列中的任务
+
+        Args:
+            runner_id: 本次认领的租约标识（进程标识 + 随机后缀）
+
+        Returns:
+            MongoDB 更新操作符字典
+        """
+        update = CrawlTaskModel.update_status('running', runner_id=runner_id, heartbeat_at=datetime.utcnow())
+        update['$inc'] = {'attempts': 1}
+        return update
+
+    @staticmethod
+    def requeue() -> Dict[str, Any]:
+        """
+        将心跳超时的任务放回队列（由其他 worker 从检查点继续）
+
+        Returns:
+            MongoDB 更新操作符字典
+        """
+        return {
+            '$set': {
+                'status': 'pending',
+                'runner_id': None,
+                'heartbeat_at': None,
+                'queued_at': datetime.utcnow()
+            }
+        }
+
+    @staticmethod
+    def heartbeat(runner_id: str) -> Dict[str, Any]:
+        """
+        更新任务心跳（运行中的任务定期调用，用于识别进程退出后遗留的任务）
+
+        Args:
+            runner_id: 本次认领的租约标识（进程标识 + 随机后缀）
+
+        Returns:
+            MongoDB 更新操作符字典
+        """
+        return {
+            '$set': {
+                'runner_id': runner_id,
+                'heartbeat_at': datetime.utcnow()
+            }
+        }
+
     @staticmethod
     def update_statistics(total_links: int, valid_links: int,
-                         invalid_links: int, new_links: int = 0, valid_rate: float = 0.0, precision_rate: float = 0.0) -> Dict[str, Any]:
+                         invalid_links: int, new_links: int = 0, valid_rate: float = 0.0, precision_rate: float = 0.0,
+                         crawl_stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         更新任务统计信息
 
@@ -77,6 +134,7 @@ class CrawlTaskModel:
             valid_links: 有效链接数
             invalid_links: 无效链接数
             new_links: 新增链接数
+            crawl_stats: 爬取过程统计（请求耗时等）
 
         Returns:
             MongoDB 更新操作符字典
@@ -84,16 +142,20 @@ class CrawlTaskModel:
         # valid_rate = valid_links / total_links if total_links > 0 else 0
         # precision_rate = valid_links / (valid_links + invalid_links) if (valid_links + invalid_links) > 0 else 0
 
+        statistics = {
+            'total_links': total_links,
+            'valid_links': valid_links,
+            'invalid_links': invalid_links,
+            'new_links': new_links,
+            'valid_rate': round(valid_rate, 4),
+            'precision_rate': round(precision_rate, 4)
+        }
+        if crawl_stats:
+            statistics['crawl_stats'] = crawl_stats
+
         return {
             '$set': {
-                'statistics': {
-                    'total_links': total_links,
-                    'valid_links': valid_links,
-                    'invalid_links': invalid_links,
-                    'new_links': new_links,
-                    'valid_rate': round(valid_rate, 4),
-                    'precision_rate': round(precision_rate, 4)
-                }
+                'statistics': statistics
             }
         }
 
@@ -118,6 +180,10 @@ class CrawlTaskModel:
             doc['started_at'] = doc['started_at'].isoformat()
         if 'completed_at' in doc and doc['completed_at']:
             doc['completed_at'] = doc['completed_at'].isoformat()
+        if 'queued_at' in doc and doc['queued_at']:
+            doc['queued_at'] = doc['queued_at'].isoformat()
+        if 'heartbeat_at' in doc and doc['heartbeat_at']:
+            doc['heartbeat_at'] = doc['heartbeat_at'].isoformat()
 
         return doc
 
@@ -141,4 +207,7 @@ class CrawlTaskModel:
         if data.get('task_type') not in ['scheduled', 'manual']:
             return False, '任务类型必须是 scheduled 或 manual'
 
+        if data.get('engine', 'recursive') not in ['recursive', 'async']:
+            return False, '爬取引擎必须是 recursive 或 async'
+
         return True, None
@@ -2,7 +2,7 @@
 爬取链接模型
 """
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from bson import ObjectId
 
 
@@ -15,7 +15,9 @@ class CrawledLinkModel:
     def create(website_id: ObjectId, task_id: ObjectId, url: str,
                domain: str, link_type: str, status_code: Optional[int] = None,
                content_type: Optional[str] = None, source_url: Optional[str] = None,
-               ip_address: Optional[str] = None, importance_score: Optional[float] = None) -> Dict[str, Any]:
+               ip_address: Optional[str] = None, importance_score: Optional[float] = None,
+               is_ad_domain: Optional[bool] = None, etag: Optional[str] = None, last_modified: Optional[str] = None,
+               content_length: Optional[int] = None, out_links: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         创建爬取链接文档
 
@@ -30,6 +32,11 @@ class CrawledLinkModel:
             source_url: 来源URL
             ip_address: IP地址
             importance_score: 重要性评分
+            is_ad_domain: 链接主机是否属于广告/跟踪域名（domain.json）
+            etag: 响应头 ETag（用于条件请求）
+            last_modified: 响应头 Last-Modified（用于条件请求）
+            content_length: 内容大小（字节）
+            out_links: 页面出链（页面被抓取解析时才有）
 
         Returns:
             链接文档字典
@@ -44,6 +51,11 @@ class CrawledLinkModel:
             'content_type': content_type,
             'ip_address': ip_address,
             'importance_score': importance_score,
+            'is_ad_domain': is_ad_domain,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_length': content_length,
+            'out_links': out_links,
             'first_crawled_at': datetime.utcnow(),
             'last_crawled_at': datetime.utcnow(),
             'crawl_count': 1,
@@ -67,6 +79,28 @@ class CrawledLinkModel:
             }
         }
 
+    @staticmethod
+    def upsert(doc: Dict[str, Any]) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        由 create 生成的文档构造按 (website_id, url) 写入的 upsert 操作
+
+        新链接插入完整文档；已存在的链接保留 first_crawled_at，
+        更新本次爬取的字段与 last_crawled_at，crawl_count 加 1。
+
+        Args:
+            doc: create 返回的链接文档
+
+        Returns:
+            (过滤条件, 更新操作符字典)
+        """
+        update = CrawledLinkModel.update_crawl_info()
+        update['$set'].update({
+            key: value for key, value in doc.items()
+            if key not in ('website_id', 'url', 'first_crawled_at', 'last_crawled_at', 'crawl_count')
+        })
+        update['$setOnInsert'] = {'first_crawled_at': doc['first_crawled_at']}
+        return {'website_id': doc['website_id'], 'url': doc['url']}, update
+
     @staticmethod
     def to_dict(doc: Dict[str, Any]) -> Dict[str, Any]:
         """
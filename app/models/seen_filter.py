@@ -0,0 +1,46 @@
+"""
+已爬取 URL 过滤器模型
+"""
+from datetime import datetime
+from typing import Dict, Any
+from bson import ObjectId, Binary
+
+
+class SeenFilterModel:
+    """网站已爬取 URL 的布隆过滤器（每个网站一个文档）"""
+
+    COLLECTION_NAME = 'seen_filters'
+
+    @staticmethod
+    def upsert(website_id: ObjectId, capacity: int, error_rate: float,
+               num_bits: int, num_hashes: int, bits: Binary, count: int) -> Dict[str, Any]:
+        """
+        生成过滤器的更新（插入）文档
+
+        Args:
+            website_id: 网站ID
+            capacity: 设计容量
+            error_rate: 设计误判率
+            num_bits: 位数组长度
+            num_hashes: 哈希函数个数
+            bits: 位数组
+            count: 已加入的元素数量
+
+        Returns:
+            MongoDB 更新操作符字典
+        """
+        return {
+            '$set': {
+                'capacity': capacity,
+                'error_rate': error_rate,
+                'num_bits': num_bits,
+                'num_hashes': num_hashes,
+                'bits': bits,
+                'count': count,
+                'updated_at': datetime.utcnow()
+            },
+            '$setOnInsert': {
+                'website_id': website_id,
+                'created_at': datetime.utcnow()
+            }
+        }
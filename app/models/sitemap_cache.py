@@ -0,0 +1,73 @@
+"""
+站点地图缓存模型
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+from bson import ObjectId
+
+
+class SitemapCacheModel:
+    """
+    网站 robots.txt 与站点地图的解析结果缓存（每个网站一个文档）
+
+    页面条目按块存入 sitemap_entries 集合（见 entries_chunk），避免单个文档超过 16MB 限制；
+    缓存文档记录本次抓取时间，读取时只使用 fetched_at 与之相同的条目块。
+    """
+
+    COLLECTION_NAME = 'sitemap_cache'
+    ENTRIES_COLLECTION_NAME = 'sitemap_entries'
+
+    @staticmethod
+    def upsert(website_id: ObjectId, sitemaps: List[str], fetched_at: datetime,
+               entry_count: int, chunks: int, ttl: int) -> Dict[str, Any]:
+        """
+        生成缓存的更新（插入）文档
+
+        Args:
+            website_id: 网站ID
+            sitemaps: 已抓取的站点地图地址
+            fetched_at: 抓取时间（与条目块的 fetched_at 对应）
+            entry_count: 页面条目数
+            chunks: 条目块数
+            ttl: 缓存有效期（秒）
+
+        Returns:
+            MongoDB 更新操作符字典
+        """
+        return {
+            '$set': {
+                'sitemaps': sitemaps,
+                'entry_count': entry_count,
+                'chunks': chunks,
+                'fetched_at': fetched_at,
+                'expires_at': fetched_at + timedelta(seconds=ttl)
+            },
+            '$unset': {
+                'entries': ''
+            },
+            '$setOnInsert': {
+                'website_id': website_id
+            }
+        }
+
+    @staticmethod
+    def entries_chunk(website_id: ObjectId, fetched_at: datetime, index: int,
+                      entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        生成一个页面条目块文档
+
+        Args:
+            website_id: 网站ID
+            fetched_at: 所属缓存的抓取时间
+            index: 块序号（从 0 开始）
+            entries: 页面条目 [{'loc': str, 'lastmod': datetime | None}, ...]
+
+        Returns:
+            条目块文档字典
+        """
+        return {
+            'website_id': website_id,
+            'fetched_at': fetched_at,
+            'index': index,
+            'entries': entries
+        }
@@ -13,7 +13,8 @@ class WebsiteModel:
 
     @staticmethod
     def create(name: str, url: str, domain: str,
-               crawl_depth: int = 3, max_links: int = 1000) -> Dict[str, Any]:
+               crawl_depth: int = 3, max_links: int = 1000,
+               crawl_engine: str = 'recursive', crawl_concurrency: int = 20) -> Dict[str, Any]:
         """
         创建网站文档
 
@@ -23,6 +24,8 @@ class WebsiteModel:
             domain: 域名
             crawl_depth: 爬取深度
             max_links: 最大链接数
+            crawl_engine: 默认爬取引擎 (recursive/async)
+            crawl_concurrency: async 引擎同时在途的请求数
 
         Returns:
             网站文档字典
@@ -34,6 +37,8 @@ class WebsiteModel:
             'status': 'active',
             'crawl_depth': crawl_depth,
             'max_links': max_links,
+            'crawl_engine': crawl_engine,
+            'crawl_concurrency': crawl_concurrency,
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         }
@@ -100,4 +105,68 @@ class WebsiteModel:
             if not isinstance(data['max_links'], int) or data['max_links'] < 1:
                 return False, '最大链接数必须是正整数'
 
+        if 'crawl_engine' in data:
+            if data['crawl_engine'] not in ['recursive', 'async']:
+                return False, '爬取引擎必须是 recursive 或 async'
+
+        if 'link_validation' in data:
+            if data['link_validation'] not in ['get', 'head']:
+                return False, '链接校验方式必须是 get 或 head'
+
+        if 'max_body_bytes' in data:
+            if not isinstance(data['max_body_bytes'], int) or data['max_body_bytes'] < 1:
+                return False, '页面最大字节数必须是正整数'
+
+        if 'parse_workers' in data:
+            if not isinstance(data['parse_workers'], int) or data['parse_workers'] < 0:
+                return False, '解析进程数不能为负数'
+
+        for key in ('request_timeout_min', 'request_timeout_max'):
+            if key in data:
+                if not isinstance(data[key], (int, float)) or data[key] <= 0:
+                    return False, f'{key} 必须大于 0'
+        if data.get('request_timeout_min', 0) > data.get('request_timeout_max', float('inf')):
+            return False, 'request_timeout_min 不能大于 request_timeout_max'
+
+        if 'fetch_max_retries' in data:
+            if not isinstance(data['fetch_max_retries'], int) or data['fetch_max_retries'] < 0:
+                return False, '重试次数不能为负数'
+
+        if 'breaker_threshold' in data:
+            if not isinstance(data['breaker_threshold'], int) or data['breaker_threshold'] < 1:
+                return False, '熔断阈值必须是正整数'
+
+        if 'host_max_concurrency' in data:
+            if not isinstance(data['host_max_concurrency'], int) or data['host_max_concurrency'] < 1:
+                return False, '单主机并发数必须是正整数'
+
+        if 'host_min_delay' in data:
+            if not isinstance(data['host_min_delay'], (int, float)) or data['host_min_delay'] < 0:
+                return False, '单主机请求间隔不能为负数'
+
+        if 'crawl_concurrency' in data:
+            if not isinstance(data['crawl_concurrency'], int) or data['crawl_concurrency'] < 1:
+                return False, '并发请求数必须是正整数'
+
+        for key in ('max_pages', 'max_crawl_bytes'):
+            if data.get(key) is not None:
+                if not isinstance(data[key], int) or data[key] < 1:
+                    return False, f'{key} 必须是正整数'
+
+        if data.get('max_crawl_seconds') is not None:
+            if not isinstance(data['max_crawl_seconds'], (int, float)) or data['max_crawl_seconds'] <= 0:
+                return False, 'max_crawl_seconds 必须大于 0'
+
+        if 'use_sitemap' in data:
+            if not isinstance(data['use_sitemap'], bool):
+                return False, 'use_sitemap 必须是布尔值'
+
+        if 'sitemap_ttl' in data:
+            if not isinstance(data['sitemap_ttl'], int) or data['sitemap_ttl'] < 0:
+                return False, '站点地图缓存时间不能为负数'
+
+        if 'url_rules' in data:
+            if data['url_rules'] is not None and not isinstance(data['url_rules'], dict):
+                return False, 'URL 规范化规则必须是对象'
+
         return True, None
@@ -0,0 +1,223 @@
+"""
+广告域名匹配 - 将 domain.json 编译为按标签反转的后缀树，按主机名判断是否为广告/跟踪域名
+"""
+import json
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+
+# 广告/跟踪域名列表（{"domains": [...]}）与编译结果缓存
+DOMAIN_LIST_PATH = os.path.join(Path(__file__).resolve().parent.parent.parent, 'domain.json')
+CACHE_SUFFIX = '.cache'
+
+# 检查列表文件是否变化的间隔（秒）
+RELOAD_CHECK_INTERVAL = 10
+
+# 缓存格式版本（编译结构变化时递增）
+CACHE_VERSION = 1
+
+# 后缀树中标记域名结尾的键（域名标签不会为空串）
+_END = ''
+
+# hosts 文件格式中的黑洞地址（列表中以省略末段的形式出现），不是广告服务器
+SINKHOLE_PREFIXES = ('0.0.0', '127.0.0')
+
+
+def is_ipv4(labels):
+    """标签序列是否构成 IPv4 地址"""
+    return len(labels) == 4 and all(label.isdigit() for label in labels)
+
+
+def compile_domains(domains):
+    """
+    将域名列表编译为后缀树：从顶级标签开始逐级嵌套的 dict
+
+    参数:
+        domains: iterable[str]
+
+    返回:
+        tuple: (trie, count) - 后缀树与收录的域名数
+    """
+    trie = {}
+    count = 0
+    for domain in domains:
+        labels = [label for label in str(domain).strip().lower().rstrip('.').split('.') if label]
+        if not labels or '.'.join(labels) in SINKHOLE_PREFIXES:
+            continue
+        node = trie
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        if _END not in node:
+            node[_END] = '.'.join(labels)
+            count += 1
+    return trie, count
+
+
+class AdDomainMatcher:
+    """
+    线程安全的广告域名匹配器（进程内共享）
+
+    主机名按标签从右向左在后缀树中查找，命中任一列表项即视为该域名或其子域名，
+    查找代价与主机名的标签数成正比。列表中部分条目省略了顶级域名（如 ad.ae.doubleclick），
+    因此主机名去掉最后一个标签后再查找一次。IP 地址条目同样省略了末段（如 10.130.208），
+    IPv4 主机按前三段精确匹配。
+
+    编译结果按列表文件的修改时间与大小缓存到磁盘，各进程启动时直接加载；
+    列表文件变化后在下一次查询时自动重新编译（最多每 RELOAD_CHECK_INTERVAL 秒检查一次）。
+    """
+
+    def __init__(self, path=DOMAIN_LIST_PATH, cache_path=None):
+        """
+        参数:
+            path: str - 域名列表文件
+            cache_path: str - 编译结果缓存文件，默认为 path + '.cache'
+        """
+        self.path = path
+        self.cache_path = cache_path or path + CACHE_SUFFIX
+        self.from_cache = False
+        self.count = 0
+        self._trie = None
+        self._signature = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_cache(self, signature):
+        """读取与当前列表文件对应的编译缓存，不存在或已过期返回 None"""
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+        if not isinstance(cached, dict) or cached.get('version') != CACHE_VERSION:
+            return None
+        if tuple(cached.get('signature') or ()) != signature:
+            return None
+        return cached['trie'], cached['count']
+
+    def _save_cache(self, signature, trie, count):
+        """写入编译缓存（先写临时文件再替换，避免其他进程读到不完整的文件）"""
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({
+                    'version': CACHE_VERSION,
+                    'signature': signature,
+                    'trie': trie,
+                    'count': count
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"写入广告域名缓存失败: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def load(self):
+        """加载（或重新编译）域名列表，列表文件不存在时匹配器为空"""
+        with self._lock:
+            self._reload()
+
+    def _reload(self):
+        """调用方持有锁"""
+        self._last_check = time.monotonic()
+        try:
+            signature = self._file_signature()
+        except OSError:
+            if self._trie is None:
+                print(f"广告域名列表不存在: {self.path}")
+                self._trie, self.count = {}, 0
+            return
+        if signature == self._signature:
+            return
+
+        cached = self._load_cache(signature)
+        if cached is not None:
+            trie, count = cached
+            self.from_cache = True
+        else:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"读取广告域名列表失败: {e}")
+                if self._trie is None:
+                    self._trie, self.count = {}, 0
+                return
+            trie, count = compile_domains(data.get('domains', []) if isinstance(data, dict) else data)
+            self.from_cache = False
+            self._save_cache(signature, trie, count)
+
+        reloaded = self._signature is not None
+        self._trie, self.count, self._signature = trie, count, signature
+        if reloaded:
+            print(f"广告域名列表已更新，重新加载 {count} 个域名")
+
+    def _current(self):
+        """返回当前后缀树，按间隔检查列表文件是否变化"""
+        with self._lock:
+            if self._trie is None or time.monotonic() - self._last_check >= RELOAD_CHECK_INTERVAL:
+                self._reload()
+            return self._trie
+
+    @staticmethod
+    def _exact(trie, labels):
+        node = trie
+        for label in reversed(labels):
+            node = node.get(label)
+            if node is None:
+                return None
+        return node.get(_END)
+
+    @staticmethod
+    def _lookup(trie, labels):
+        node = trie
+        for label in reversed(labels):
+            node = node.get(label)
+            if node is None:
+                return None
+            if _END in node:
+                return node[_END]
+        return None
+
+    def match(self, host):
+        """
+        查找主机名命中的列表项
+
+        参数:
+            host: str - 主机名（可含端口）
+
+        返回:
+            str | None - 命中的广告域名
+        """
+        if not host:
+            return None
+        host = host.lower().rsplit('@', 1)[-1].split(':', 1)[0].rstrip('.')
+        labels = host.split('.')
+        trie = self._current()
+        if is_ipv4(labels):
+            return self._exact(trie, labels) or self._exact(trie, labels[:3])
+        matched = self._lookup(trie, labels)
+        if matched is None and len(labels) > 2:
+            # 列表项省略了顶级域名
+            matched = self._lookup(trie, labels[:-1])
+        return matched
+
+    def is_ad_host(self, host):
+        """主机名是否属于广告/跟踪域名"""
+        return self.match(host) is not None
+
+    def stats(self):
+        """已加载的域名数与是否来自缓存"""
+        with self._lock:
+            return {'domains': self.count, 'from_cache': self.from_cache}
+
+
+# 进程内共享的广告域名匹配器
+ad_domains = AdDomainMatcher()
@@ -0,0 +1,138 @@
+"""
+字符集检测 - 分层快速判断页面编码并按主机记忆检测结果
+"""
+import codecs
+import re
+import threading
+
+import chardet
+
+# <meta charset> 嗅探范围与 chardet 检测的最大前缀长度（字节）
+META_SNIFF_BYTES = 4096
+CHARDET_PREFIX_BYTES = 64 * 1024
+
+# chardet 结果的最低可信度，低于该值回退为 utf-8
+MIN_CONFIDENCE = 0.7
+
+# 字节序标记
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# 兼容性更好的超集编码
+ENCODING_ALIASES = {
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'x-gbk': 'gb18030',
+    'ascii': 'utf-8',
+    'us-ascii': 'utf-8',
+}
+
+_CONTENT_TYPE_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+
+
+def normalize_encoding(name):
+    """规范化编码名称，无法识别的编码返回 None"""
+    if not name:
+        return None
+    name = name.strip().lower()
+    name = ENCODING_ALIASES.get(name, name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def charset_from_content_type(content_type):
+    """从 Content-Type 响应头提取 charset"""
+    if not content_type:
+        return None
+    match = _CONTENT_TYPE_CHARSET.search(content_type)
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def charset_from_bom(content):
+    """根据字节序标记判断编码"""
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return encoding
+    return None
+
+
+def charset_from_meta(content):
+    """在文档开头嗅探 <meta charset> 或 http-equiv 中声明的编码"""
+    match = _META_CHARSET.search(content[:META_SNIFF_BYTES])
+    if not match:
+        return None
+    return normalize_encoding(match.group(1).decode('ascii', errors='ignore'))
+
+
+def charset_from_chardet(content):
+    """仅对前缀做 chardet 检测，可信度不足返回 None"""
+    detected = chardet.detect(content[:CHARDET_PREFIX_BYTES])
+    if (detected.get('confidence') or 0) < MIN_CONFIDENCE:
+        return None
+    return normalize_encoding(detected.get('encoding'))
+
+
+class CharsetDetector:
+    """
+    分层编码检测器
+
+    检测顺序：HTTP Content-Type charset → BOM → <meta charset> →
+    同主机已记忆的编码 → 前缀 chardet → utf-8。
+    同一站点的页面编码通常一致，检测结果按主机记忆，避免重复运行 chardet。
+    """
+
+    def __init__(self):
+        self._host_charsets = {}
+        self._lock = threading.Lock()
+
+    def detect(self, content, content_type=None, host=None):
+        """
+        判断 bytes 内容的编码
+
+        返回:
+            tuple: (encoding, source) - source 为检测来源
+                   (header/bom/meta/host/chardet/default)
+        """
+        encoding = charset_from_content_type(content_type)
+        if encoding:
+            source = 'header'
+        else:
+            encoding = charset_from_bom(content)
+            source = 'bom'
+        if not encoding:
+            encoding = charset_from_meta(content)
+            source = 'meta'
+        if not encoding and host:
+            with self._lock:
+                encoding = self._host_charsets.get(host)
+            source = 'host'
+        if not encoding:
+            encoding = charset_from_chardet(content)
+            source = 'chardet'
+        if not encoding:
+            return 'utf-8', 'default'
+
+        if host and source != 'host':
+            with self._lock:
+                self._host_charsets[host] = encoding
+        return encoding, source
+
+    def decode(self, content, content_type=None, host=None):
+        """将 bytes 解码为字符串，非法字节忽略"""
+        encoding, _ = self.detect(content, content_type, host)
+        try:
+            return content.decode(encoding, errors='ignore')
+        except LookupError:
+            return content.decode('utf-8', errors='ignore')
+
+
+# 全局共享的编码检测器
+charset_detector = CharsetDetector()
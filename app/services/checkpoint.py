@@ -0,0 +1,218 @@
+"""
+爬取检查点 - 定期保存遍历进度与任务心跳，进程重启后可从检查点继续
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+import zlib
+
+from bson import Binary
+from pymongo import ReturnDocument
+
+import app.global_vars as app_global
+from app.models import CrawlCheckpointModel, CrawlTaskModel
+
+# 遍历进度保存间隔与任务心跳间隔（秒）
+CHECKPOINT_INTERVAL = 30
+HEARTBEAT_INTERVAL = 10
+
+# 检查任务是否被取消的间隔（秒）：取消可能由其他进程中的 API 发起，只能通过数据库得知
+CANCEL_POLL_INTERVAL = 0.5
+
+# 当前进程标识：任务记录执行它的进程，便于识别遗留任务
+RUNNER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def new_lease_id():
+    """
+    生成一次认领的租约标识（进程标识 + 随机后缀）
+
+    同一进程中的多个 worker 线程可能先后认领同一任务（任务被放回队列后重新认领），
+    每次认领使用新的标识，旧的执行不会因进程相同而通过租约检查。
+    """
+    return f"{RUNNER_ID}:{uuid.uuid4().hex[:8]}"
+
+
+def _unique(links):
+    """保持顺序去重"""
+    return list(dict.fromkeys(links))
+
+
+class CrawlCheckpoint:
+    """
+    单个任务的检查点
+
+    引擎在每个页面完成后调用 save（按间隔节流），每层结束时强制保存；
+    状态包括当前层号、本层剩余 url、本层已发现链接、之前各层的链接与已访问集合，
+    以 zlib 压缩的 JSON 存入 crawl_checkpoints。
+
+    任务与检查点都记录持有它的 runner_id（本次认领的租约标识）：心跳或保存发现任务已被放回队列
+    或由其他 worker 接管时，标记 lease_lost 并设置停止标志，此后不再保存、删除检查点，也不再更新任务状态。
+    """
+
+    def __init__(self, db, task_id, interval=CHECKPOINT_INTERVAL, runner_id=None, stop_event=None):
+        """
+        参数:
+            db: 数据库连接
+            task_id: ObjectId - 任务ID
+            interval: float - 保存间隔（秒）
+            runner_id: str - 本次认领的租约标识，缺省时新生成
+            stop_event: StopEvent - 本次执行的停止信号，缺省为任务当前的停止信号
+        """
+        self.db = db
+        self.task_id = task_id
+        self.interval = interval
+        self.runner_id = runner_id or new_lease_id()
+        self.stop_event = stop_event or app_global.get_stop_event(task_id)
+        self.saves = 0
+        self.lease_lost = False
+        self._last_save = 0.0
+        self._heartbeat_stop = None
+
+    def start(self, website_id, params):
+        """新任务开始时创建检查点文档（记录任务参数，供恢复时使用）"""
+        self.db.crawl_checkpoints.replace_one(
+            {'task_id': self.task_id},
+            CrawlCheckpointModel.create(self.task_id, website_id, params, self.runner_id),
+            upsert=True
+        )
+        self._last_save = time.monotonic()
+
+    def load(self):
+        """
+        读取检查点
+
+        返回:
+            tuple: (params, state) - 不存在时均为 None；尚未保存进度时 state 为 None
+        """
+        doc = self.db.crawl_checkpoints.find_one_and_update(
+            {'task_id': self.task_id},
+            CrawlCheckpointModel.take_over(self.runner_id)
+        )
+        if not doc:
+            return None, None
+        state = None
+        if doc.get('state'):
+            state = json.loads(zlib.decompress(bytes(doc['state'])).decode('utf-8'))
+        return doc.get('params'), state
+
+    def due(self):
+        """距上次保存是否已超过保存间隔"""
+        return time.monotonic() - self._last_save >= self.interval
+
+    def save(self, level, frontier, level_found, all_links, visited, force=False):
+        """
+        保存遍历进度（未到保存间隔且非强制时跳过）
+
+        参数:
+            level: int - 当前层号（从 0 开始）
+            frontier: list[str] - 本层尚未完成的 url
+            level_found: list[str] - 本层已发现的链接
+            all_links: list[str] - 之前各层发现的链接
+            visited: set - 已访问（已入队）的 url
+            force: bool - 忽略保存间隔
+        """
+        if self.lease_lost or (not force and not self.due()):
+            return False
+        self._last_save = time.monotonic()
+
+        all_links = _unique(all_links)
+        state = {
+            'level': level,
+            'frontier': list(frontier),
+            'level_found': _unique(level_found),
+            'all_links': all_links,
+            'visited': list(visited)
+        }
+        blob = zlib.compress(json.dumps(state).encode('utf-8'))
+        result = self.db.crawl_checkpoints.update_one(
+            {'task_id': self.task_id, 'runner_id': self.runner_id},
+            CrawlCheckpointModel.update_state(
+                state=Binary(blob),
+                level=level,
+                frontier_size=len(frontier),
+                links=len(all_links) + len(state['level_found'])
+            )
+        )
+        if result.matched_count == 0:
+            # 检查点已被其他 worker 接管
+            self._lose_lease()
+            return False
+        self.saves += 1
+        return True
+
+    def clear(self):
+        """任务结束后删除检查点（租约已失去时保留，供接管的 worker 继续使用）"""
+        if self.lease_lost:
+            return
+        self.db.crawl_checkpoints.delete_one({'task_id': self.task_id, 'runner_id': self.runner_id})
+
+    def _lose_lease(self):
+        if not self.lease_lost:
+            print(f"任务已被放回队列或由其他 worker 接管，停止执行: {self.task_id}")
+        self.lease_lost = True
+        self.stop_event.set()
+
+    def beat(self):
+        """
+        更新一次任务心跳
+
+        只更新本次认领持有的任务：任务已被放回队列或由其他 worker 接管时标记租约失去；
+        任务已被取消（可能由其他进程中的 API 发起）时设置停止标志。两种情况下爬取都会尽快结束。
+        """
+        task = self.db.crawl_tasks.find_one_and_update(
+            {'_id': self.task_id, 'runner_id': self.runner_id},
+            CrawlTaskModel.heartbeat(self.runner_id),
+            projection={'status': 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if task is None:
+            self._lose_lease()
+        elif task.get('status') != 'running':
+            self.stop_event.set()
+
+    def poll(self):
+        """
+        检查一次任务状态（只读）
+
+        任务已被取消时设置停止标志，已被放回队列或由其他 worker 接管时标记租约失去。
+        """
+        task = self.db.crawl_tasks.find_one({'_id': self.task_id}, {'status': 1, 'runner_id': 1})
+        if task is None or task.get('runner_id') != self.runner_id:
+            self._lose_lease()
+        elif task.get('status') != 'running':
+            self.stop_event.set()
+
+    def start_heartbeat(self, interval=HEARTBEAT_INTERVAL, poll_interval=CANCEL_POLL_INTERVAL):
+        """
+        启动后台心跳线程
+
+        每 interval 秒更新一次 heartbeat_at，其间每 poll_interval 秒检查任务是否被取消，
+        使独立 worker 进程在取消后约一秒内停止抓取。
+        """
+        self.beat()
+        stop = threading.Event()
+        self._heartbeat_stop = stop
+
+        def run():
+            last_beat = time.monotonic()
+            while not stop.wait(poll_interval):
+                try:
+                    if time.monotonic() - last_beat >= interval:
+                        last_beat = time.monotonic()
+                        self.beat()
+                    else:
+                        self.poll()
+                except Exception as e:
+                    print(f"任务心跳更新失败: {self.task_id} - {e}")
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def stop_heartbeat(self):
+        """停止后台心跳线程"""
+        if self._heartbeat_stop is not None:
+            self._heartbeat_stop.set()
+            self._heartbeat_stop = None
@@ -0,0 +1,100 @@
+"""
+爬取预算 - 在遍历过程中限制抓取页面数、发现链接数、下载字节数与耗时
+"""
+import threading
+import time
+
+# 预算名称（同时作为 stop_reason 取值）
+BUDGET_NAMES = ('max_pages', 'max_links', 'max_bytes', 'max_seconds')
+
+
+class CrawlBudget:
+    """
+    线程安全的爬取预算
+
+    引擎在抓取每个页面前调用 start_page，页面中发现的链接经 admit 去重计数；
+    任一预算用尽后不再接受新的抓取与链接，并记录首个生效的预算（stop_reason）。
+    值为 None 的预算不做限制。
+    """
+
+    def __init__(self, max_pages=None, max_links=None, max_bytes=None, max_seconds=None):
+        self.max_pages = max_pages
+        self.max_links = max_links
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.pages = 0
+        self.bytes = 0
+        self.stop_reason = None
+        self._links = set()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _limit_reached(self):
+        """返回已用尽的预算名称，未用尽返回 None（调用方持有锁）"""
+        if self.max_seconds is not None and time.monotonic() - self._started >= self.max_seconds:
+            return 'max_seconds'
+        if self.max_bytes is not None and self.bytes >= self.max_bytes:
+            return 'max_bytes'
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            return 'max_pages'
+        if self.max_links is not None and len(self._links) >= self.max_links:
+            return 'max_links'
+        return None
+
+    def _stop(self, reason):
+        if self.stop_reason is None:
+            self.stop_reason = reason
+
+    def exhausted(self):
+        """预算是否已用尽（用尽时记录 stop_reason）"""
+        with self._lock:
+            reason = self._limit_reached()
+            if reason:
+                self._stop(reason)
+            return reason is not None
+
+    def start_page(self):
+        """申请抓取一个页面，预算用尽时返回 False"""
+        with self._lock:
+            reason = self._limit_reached()
+            if reason:
+                self._stop(reason)
+                return False
+            self.pages += 1
+            return True
+
+    def add_bytes(self, size):
+        """累计已下载的字节数"""
+        with self._lock:
+            self.bytes += size or 0
+
+    def admit(self, links):
+        """
+        对发现的链接去重计数，超出 max_links 的部分被丢弃
+
+        返回:
+            list[str] - 本次新接受的链接
+        """
+        admitted = []
+        with self._lock:
+            for link in links:
+                if link in self._links:
+                    continue
+                if self.max_links is not None and len(self._links) >= self.max_links:
+                    self._stop('max_links')
+                    break
+                self._links.add(link)
+                admitted.append(link)
+        return admitted
+
+    def stats(self):
+        """预算使用情况与停止原因"""
+        with self._lock:
+            return {
+                'stop_reason': self.stop_reason,
+                'pages': self.pages,
+                'links': len(self._links),
+                'bytes': self.bytes,
+                'elapsed': round(time.monotonic() - self._started, 2),
+                'limits': {name: getattr(self, name) for name in BUDGET_NAMES}
+            }
@@ -0,0 +1,277 @@
+"""
+异步爬取引擎 - 基于 asyncio 的分层（广度优先）并发链接遍历
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from app.services.host_scheduler import host_of
+
+# 选择就绪主机时向前查看的队列长度
+READY_SCAN_WINDOW = 64
+
+# 等待线程池结果时检查取消信号的间隔（秒）
+CANCEL_POLL_INTERVAL = 0.2
+
+
+def save_checkpoint(checkpoint, level, frontier, level_found, all_links, visited, force=False):
+    """
+    保存遍历进度；保存失败（如数据库暂时不可用）只记录警告，不中断遍历
+
+    返回:
+        bool - 是否已保存
+    """
+    try:
+        return checkpoint.save(level, frontier, level_found, all_links, visited, force=force)
+    except Exception as e:
+        print(f"检查点保存失败，继续爬取: {checkpoint.task_id} - {e}")
+        return False
+
+
+def next_frontier(links, exclude, visited, rank=None):
+    """
+    由当前层发现的链接生成下一层待抓取队列
+
+    参数:
+        links: iterable[str] - 当前层发现的链接
+        exclude: set - 需要排除的 url 集合
+        visited: set - 已访问（已入队）的 url 集合，会被原地更新
+        rank: callable - 可选，rank(urls) 返回按优先级从高到低排列的 url
+
+    返回:
+        frontier: list[str] - 下一层待抓取的 url（已去重；传入 rank 时按优先级排列，否则保持发现顺序）
+    """
+    frontier = []
+    for link in links:
+        if link in exclude or link in visited:
+            continue
+        # 入队即标记为已访问，避免同层重复抓取
+        visited.add(link)
+        frontier.append(link)
+    if rank is not None:
+        frontier = rank(frontier)
+    return frontier
+
+
+def iter_results(futures, should_stop=None, poll=CANCEL_POLL_INTERVAL):
+    """
+    按提交顺序产出线程池任务的结果，等待期间定期检查取消信号
+
+    should_stop 返回 True 时取消尚未开始的任务并停止产出。
+
+    参数:
+        futures: list[Future] - 已提交的任务
+        should_stop: callable - 可选，返回 True 表示任务已被取消
+        poll: float - 检查取消信号的间隔（秒）
+    """
+    for future in futures:
+        while True:
+            if should_stop is not None and should_stop():
+                for pending in futures:
+                    pending.cancel()
+                return
+            try:
+                result = future.result(timeout=poll)
+            except FutureTimeoutError:
+                continue
+            yield result
+            break
+
+
+class AsyncCrawlEngine:
+    """
+    基于 asyncio 的爬取引擎
+
+    按深度逐层遍历：每一层的 url 放入一个队列，由固定数量的 worker 并发抓取，
+    该层全部完成后再生成下一层队列。页面的下载与解析由外部传入的
+    fetch_links(url, exclude) 完成，引擎只负责遍历调度与并发控制。
+
+    传入 scheduler（HostScheduler）时，worker 优先选取当前可请求的主机的 url，
+    被限流主机的 url 留在队列中稍后再取，使全局 worker 保持忙碌。
+    传入 budget（CrawlBudget）时，预算用尽后清空队列，不再发起新的抓取。
+    传入 should_stop 时，每次抓取前检查取消信号，取消后丢弃剩余队列并立即返回。
+    传入 checkpoint 时，按间隔及每层结束时保存遍历进度。
+    传入 rank 时，每层按链接得分从高到低抓取，预算不足时优先接受高分链接。
+    """
+
+    def __init__(self, fetch_links, concurrency=20, scheduler=None, budget=None, should_stop=None,
+                 checkpoint=None, rank=None):
+        """
+        参数:
+            fetch_links: callable - fetch_links(url, exclude) -> list[str]，返回页面中的有效链接
+            concurrency: int - worker 数量（同时在途的请求数上限）
+            scheduler: HostScheduler - 可选，主机调度器
+            budget: CrawlBudget - 可选，爬取预算
+            should_stop: callable - 可选，返回 True 表示任务已被取消
+            checkpoint: CrawlCheckpoint - 可选，遍历进度检查点
+            rank: callable - 可选，rank(urls) 返回按优先级从高到低排列的 url
+        """
+        self.fetch_links = fetch_links
+        self.concurrency = max(1, int(concurrency))
+        self.scheduler = scheduler
+        self.budget = budget
+        self.should_stop = should_stop
+        self.checkpoint = checkpoint
+        self.rank = rank
+        self._executor = None
+        # 当前层的遍历状态（供保存检查点使用）
+        self._level = 0
+        self._frontier = []
+        self._all_links = []
+        self._visited = set()
+
+    def _take(self, pending):
+        """
+        从队列中取出一个可立即请求的 url
+
+        返回:
+            tuple: (url, wait) - 无就绪主机时 url 为 None，wait 为建议等待秒数
+        """
+        if self.scheduler is None:
+            return pending.popleft(), 0.0
+
+        min_wait = None
+        for _ in range(min(len(pending), READY_SCAN_WINDOW)):
+            url = pending[0]
+            wait = self.scheduler.ready_in(host_of(url))
+            if wait <= 0:
+                return pending.popleft(), 0.0
+            # 主机未就绪：移到队尾，继续查看下一个
+            pending.rotate(-1)
+            min_wait = wait if min_wait is None else min(min_wait, wait)
+        return None, min(min_wait or 0.05, 1.0)
+
+    def _cancelled(self):
+        return self.should_stop is not None and self.should_stop()
+
+    def _admit(self, links):
+        """按链接预算接受新发现的链接"""
+        if self.budget is None:
+            return links
+        if self.rank is not None:
+            links = self.rank(links)
+        return self.budget.admit(links)
+
+    async def _worker(self, pending, exclude, found, done):
+        """从当前层队列取 url 并在线程池中执行阻塞的页面抓取"""
+        loop = asyncio.get_running_loop()
+        while pending:
+            if self._cancelled():
+                pending.clear()
+                break
+            url, wait = self._take(pending)
+            if url is None:
+                await asyncio.sleep(wait)
+                continue
+            if self.budget is not None and not self.budget.start_page():
+                # 预算用尽：丢弃本层剩余的 url
+                pending.clear()
+                break
+            try:
+                links = await loop.run_in_executor(self._executor, self.fetch_links, url, exclude)
+                found.extend(self._admit(links))
+            except Exception as e:
+                print(f"抓取异常: {url} - {e}")
+            done.add(url)
+            self._save_progress(found, done)
+
+    def _save_progress(self, found, done):
+        """按间隔保存本层进度（尚未完成的 url 与已发现的链接）"""
+        if self.checkpoint is None or not self.checkpoint.due():
+            return
+        remaining = [u for u in self._frontier if u not in done]
+        save_checkpoint(self.checkpoint, self._level, remaining, found, self._all_links, self._visited)
+
+    async def _crawl_level(self, frontier, exclude, found=None):
+        """并发抓取一层的全部 url，返回该层发现的链接（found 为恢复时本层已发现的链接）"""
+        pending = deque(frontier)
+
+        found = list(found or [])
+        done = set()
+        workers = min(self.concurrency, len(frontier))
+        tasks = [asyncio.ensure_future(self._worker(pending, exclude, found, done)) for _ in range(workers)]
+        running = set(tasks)
+        while running:
+            _, running = await asyncio.wait(running, timeout=CANCEL_POLL_INTERVAL)
+            if running and self._cancelled():
+                # 取消时不等待在途的抓取（线程池中的请求在后台结束）
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                break
+        for task in tasks:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+        return found
+
+    async def crawl(self, url, depth=3, exclude=None, visited=None, seeds=None, resume=None):
+        """
+        分层并发爬取链接（与 get_all_links 参数及输出一致）
+
+        参数:
+            url: str - 入口 url
+            depth: int - 爬取深度
+            exclude: set - 需要排除的 url 集合
+            visited: set - 已访问的 url 集合
+            seeds: list[str] - 额外的种子 url（如站点地图），视为入口页面发现的链接
+            resume: dict - 可选，从检查点恢复的遍历状态
+
+        返回:
+            links: list[str] - 爬到的 links
+        """
+        if exclude is None:
+            exclude = set()
+        if visited is None:
+            visited = set()
+
+        if resume:
+            # 从检查点继续：本层只抓取尚未完成的 url
+            level = resume['level']
+            frontier = resume['frontier']
+            level_found = resume['level_found']
+            all_links = resume['all_links']
+            visited.update(resume['visited'])
+        else:
+            level = 0
+            frontier = next_frontier([url], exclude, visited)
+            level_found = []
+            all_links = []
+
+        self._all_links = all_links
+        self._visited = visited
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            # 恢复时本层可能已全部完成但尚未收尾（frontier 为空而 level_found 非空），仍需执行一次收尾
+            while (frontier or level_found) and level < depth and not self._cancelled():
+                self._level, self._frontier = level, frontier
+                found = await self._crawl_level(frontier, exclude, level_found)
+                level_found = []
+                if level == 0 and seeds:
+                    found.extend(self._admit([link for link in seeds if link not in exclude]))
+                all_links.extend(found)
+                level += 1
+                frontier = next_frontier(found, exclude, visited, self.rank) if level < depth else []
+                if frontier and self.budget is not None and self.budget.exhausted():
+                    break
+                if self.checkpoint is not None and not self._cancelled():
+                    save_checkpoint(self.checkpoint, level, frontier, [], all_links, visited, force=True)
+        finally:
+            # 不等待排队中的任务（取消时立即释放）
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        return all_links
+
+
+def crawl_links(fetch_links, url, depth=3, exclude=None, visited=None, concurrency=20, scheduler=None,
+                seeds=None, budget=None, should_stop=None, checkpoint=None, resume=None, rank=None):
+    """
+    同步调用入口：在独立事件循环中运行 AsyncCrawlEngine
+
+    返回:
+        links: list[str] - 爬到的 links
+    """
+    engine = AsyncCrawlEngine(
+        fetch_links, concurrency=concurrency, scheduler=scheduler, budget=budget, should_stop=should_stop,
+        checkpoint=checkpoint, rank=rank
+    )
+    return asyncio.run(engine.crawl(url, depth, exclude=exclude, visited=visited, seeds=seeds, resume=resume))
@@ -3,24 +3,89 @@
 """
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 from pathlib import Path
 import re
 import os
 import uuid
-import chardet
-import socket
 from datetime import datetime
 from bson import ObjectId
 from concurrent.futures import ThreadPoolExecutor, as_completed  # 多线程
+from functools import partial
 import random
 import json
+import threading
+import time
 
 from app.config import config
 import app.global_vars as app_global
 from app.database import get_db
 from app.models import CrawledLinkModel, CrawlTaskModel, CrawlLogModel
-from pymongo.errors import DuplicateKeyError  # 新增：捕获唯一索引冲突
+from app.services.crawl_engine import crawl_links, iter_results, next_frontier, save_checkpoint
+from app.services.response_cache import ResponseCache
+from app.services.http_client import get_session
+from app.services.dns_cache import dns_cache
+from app.services.link_extractor import extract_links, extract_links_from_html
+from app.services.charset import charset_detector
+from app.services.seen_filter import SeenUrlSet, load_seen_filter, save_seen_filter
+from app.services.url_canonical import canonicalize_url
+from app.services.revalidation import ValidatorStore
+from app.services.crawl_budget import CrawlBudget
+from app.services.parse_pool import ParsePool
+from app.services.link_priority import LinkScoreCache
+from app.services.link_scoring import BatchLinkScorer
+from app.services.ad_domains import ad_domains
+from app.services.link_writer import CrawledLinkWriter
+from app.services.fetch_policy import (
+    FetchPolicy, is_transient_status, DEFAULT_MAX_RETRIES, DEFAULT_BREAKER_THRESHOLD
+)
+from app.services.host_timeouts import HostTimeouts, DEFAULT_TIMEOUT_MIN, DEFAULT_TIMEOUT_MAX
+from app.services.checkpoint import CrawlCheckpoint, new_lease_id
+from app.services.sitemap import DEFAULT_SITEMAP_TTL, load_sitemap_entries, select_seeds
+from app.services.host_scheduler import (
+    HostScheduler, host_of, interleave_by_host,
+    DEFAULT_HOST_MAX_CONCURRENCY, DEFAULT_HOST_MIN_DELAY
+)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
+}
+
+# 可选的爬取引擎：recursive - 线程池逐层遍历（沿用原名称）；async - asyncio 逐层并发遍历
+CRAWL_ENGINES = ['recursive', 'async']
+
+# 丢弃失败响应时最多读取的字节数
+DISCARD_MAX_BYTES = 64 * 1024
+
+
+def decode_content(content, content_type=None, host=None):
+    """
+    将 bytes 响应体解码为字符串
+
+    依次参考 Content-Type 的 charset、BOM、<meta charset>、同主机已检测的编码，
+    最后才对内容前缀运行 chardet（见 app.services.charset）。
+    """
+    if not isinstance(content, (bytes, bytearray)):
+        return content
+
+    try:
+        return charset_detector.decode(bytes(content), content_type, host)
+    except Exception:
+        # 解码失败，使用 replace 模式
+        return content.decode('utf-8', errors='replace')
+
+
+def is_xml_content(content, content_type=None):
+    """根据 Content-Type 与内容头部判断是否为 XML 文档"""
+    if content_type:
+        ct = content_type.lower()
+        if 'xml' in ct or 'xhtml' in ct:
+            return True
+
+    # 通过内容头部检测 XML
+    head = content[:200].lstrip() if isinstance(content, str) else ''
+    h = head.lower()
+    return h.startswith('<?xml') or '<rss' in h or '<feed' in h
 
 
 def safe_soup(content, content_type=None):
@@ -29,43 +94,10 @@ def safe_soup(content, content_type=None):
     from contextlib import redirect_stderr
 
     # 先将 bytes 转换为字符串，避免 lxml 的编码错误
-    if isinstance(content, (bytes, bytearray)):
-        try:
-            # 使用 chardet 检测编码
-            detected = chardet.detect(content)
-            encoding = detected.get('encoding', 'utf-8')
-            confidence = detected.get('confidence', 0)
-
-            # 如果检测置信度太低，使用常见编码尝试
-            if confidence < 0.7:
-                for enc in ['utf-8', 'gbk', 'gb2312', 'gb18030', 'latin1']:
-                    try:
-                        content = content.decode(enc, errors='ignore')
-                        break
-                    except:
-                        continue
-                else:
-                    # 所有编码都失败，使用 replace 模式
-                    content = content.decode('utf-8', errors='replace')
-            else:
-                content = content.decode(encoding or 'utf-8', errors='ignore')
-        except Exception:
-            # 解码失败，使用 replace 模式
-            content = content.decode('utf-8', errors='replace')
+    content = decode_content(content, content_type)
 
     # 检测是否是 XML
-    is_xml = False
-    if content_type:
-        ct = content_type.lower()
-        if 'xml' in ct or 'xhtml' in ct:
-            is_xml = True
-
-    if not is_xml:
-        # 通过内容头部检测 XML
-        head = content[:200].lstrip() if isinstance(content, str) else ''
-        h = head.lower()
-        if h.startswith('<?xml') or '<rss' in h or '<feed' in h:
-            is_xml = True
+    is_xml = is_xml_content(content, content_type)
 
     # 抑制 lxml 的编码警告信息
     stderr_buffer = io.StringIO()
@@ -88,27 +120,195 @@ def safe_soup(content, content_type=None):
             return None
 
 
-def safe_request(url, headers, timeout=2):
-    """带异常处理的请求封装"""
+def _request(url, send, timeout=2, scheduler=None, should_stop=None, timeouts=None, policy=None):
+    """
+    按主机调度、超时与抓取策略执行请求
+
+    参数:
+        url: str - 请求 url
+        send: callable - send(timeout) 发起实际请求并返回响应
+        timeout: float - 固定超时（未传入 timeouts 时使用）
+        scheduler: HostScheduler - 按主机限制并发与请求间隔
+        should_stop: callable - 任务取消后不再发起请求或重试
+        timeouts: HostTimeouts - 按主机耗时确定的超时，代替固定的 timeout
+        policy: FetchPolicy - 瞬时错误的退避重试与主机熔断
+
+    返回:
+        requests.Response - 成功的响应；失败、熔断或取消返回 None
+    """
+    host = host_of(url)
+    attempts = policy.max_retries + 1 if policy is not None else 1
+    for attempt in range(attempts):
+        if should_stop is not None and should_stop():
+            return None
+        if policy is not None and not policy.allow(host):
+            print(f"主机熔断中，跳过: {url}")
+            return None
+        if scheduler is not None and not scheduler.acquire(host, should_stop):
+            return None
+        if timeouts is not None:
+            timeout = timeouts.get(host)
+        response = None
+        transient = False
+        try:
+            response = send(timeout)
+            if timeouts is not None:
+                timeouts.observe(host, response.elapsed.total_seconds())
+            response.raise_for_status()
+            if policy is not None:
+                policy.record_success(host)
+            return response
+        except requests.exceptions.HTTPError as e:
+            transient = is_transient_status(e.response.status_code)
+            print(f"HTTP错误 [{e.response.status_code}]: {url}")
+        except requests.exceptions.SSLError as e:
+            # 证书或 TLS 握手失败重试也不会成功，不视为瞬时错误（需在 ConnectionError 之前捕获）
+            print(f"SSL错误: {url} - {str(e)}")
+        except requests.exceptions.ConnectionError as e:
+            if timeouts is not None and isinstance(e, requests.exceptions.ConnectTimeout):
+                timeouts.record_timeout(host)
+            transient = True
+            print(f"连接失败: {url}")
+        except requests.exceptions.Timeout:
+            if timeouts is not None:
+                timeouts.record_timeout(host)
+            transient = True
+            print(f"请求超时: {url}")
+        except requests.exceptions.RequestException as e:
+            print(f"请求异常: {url} - {str(e)}")
+        finally:
+            if scheduler is not None:
+                scheduler.release(host, response)
+
+        if response is not None:
+            _discard(response)
+        if should_stop is not None and should_stop():
+            # 任务已取消：不再重试，也不计入主机的成功/失败
+            return None
+        if policy is None:
+            return None
+        if not transient:
+            # 主机有响应，只是该 url 不可用
+            policy.record_success(host)
+            return None
+        policy.record_failure(host)
+        if attempt + 1 >= attempts:
+            return None
+        # 退避等待期间任务被取消时立即返回
+        if _wait(policy.retry_delay(attempt), should_stop):
+            return None
+    return None
+
+
+def _discard(response):
+    """
+    关闭不再使用的响应（含流式响应）
+
+    响应体不超过 DISCARD_MAX_BYTES 时先读完，使连接回到连接池复用；更大的响应体直接断开连接。
+    """
     try:
-        response = requests.get(
+        read = 0
+        for chunk in response.iter_content(8192):
+            read += len(chunk)
+            if read > DISCARD_MAX_BYTES:
+                break
+    except Exception:
+        pass
+    finally:
+        response.close()
+
+
+def _wait(seconds, should_stop=None):
+    """
+    等待 seconds 秒，期间任务被取消时提前结束
+
+    should_stop 为 threading.Event（如 StopEvent）时直接等待该事件，否则每 0.1 秒检查一次。
+
+    返回:
+        bool - 是否因任务取消而结束
+    """
+    if isinstance(should_stop, threading.Event):
+        return should_stop.wait(seconds)
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if should_stop is not None and should_stop():
+            return True
+        time.sleep(min(0.1, max(0.0, deadline - time.monotonic())))
+    return should_stop is not None and should_stop()
+
+
+def safe_request(url, headers, timeout=2, stream=False, scheduler=None, should_stop=None, timeouts=None,
+                 policy=None):
+    """
+    带异常处理的请求封装
+
+    stream=True 时只读取响应头，响应体由调用方按需读取；
+    传入 scheduler（HostScheduler）时按主机限制并发与请求间隔；
+    传入 should_stop 时，任务取消后不再发起请求（返回 None）；
+    传入 timeouts（HostTimeouts）时使用按主机耗时确定的超时，代替固定的 timeout；
+    传入 policy（FetchPolicy）时对瞬时错误退避重试，并跳过已熔断的主机。
+    """
+    def send(request_timeout):
+        return get_session().get(
+            url,
+            headers=headers,
+            timeout=request_timeout,
+            allow_redirects=True,
+            verify=True,
+            stream=stream
+        )
+
+    return _request(url, send, timeout, scheduler, should_stop, timeouts, policy)
+
+
+def safe_head_request(url, headers, timeout=2, scheduler=None, should_stop=None, timeouts=None, policy=None):
+    """
+    HEAD 优先的轻量链接校验请求（不下载响应体）
+
+    服务器拒绝 HEAD（405/501）时回退为 Range: bytes=0-0 的 GET，
+    并以流式方式打开后立即关闭，避免下载完整内容。
+    """
+    session = get_session()
+
+    def send(request_timeout):
+        response = session.head(
             url,
             headers=headers,
-            timeout=timeout,
+            timeout=request_timeout,
             allow_redirects=True,
             verify=True
         )
-        response.raise_for_status()
+        if response.status_code in (405, 501):
+            range_headers = dict(headers, Range='bytes=0-0')
+            response = session.get(
+                url,
+                headers=range_headers,
+                timeout=request_timeout,
+                allow_redirects=True,
+                verify=True,
+                stream=True
+            )
+            response.close()
         return response
-    except requests.exceptions.HTTPError as e:
-        print(f"HTTP错误 [{e.response.status_code}]: {url}")
-    except requests.exceptions.ConnectionError:
-        print(f"连接失败: {url}")
-    except requests.exceptions.Timeout:
-        print(f"请求超时: {url}")
-    except requests.exceptions.RequestException as e:
-        print(f"请求异常: {url} - {str(e)}")
-    return None
+
+    return _request(url, send, timeout, scheduler, should_stop, timeouts, policy)
+
+
+def response_size(response):
+    """从响应头推断资源总大小（Range 响应优先取 Content-Range 中的总长度）"""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range:
+        total = content_range.rsplit('/', 1)[-1].strip()
+        if total.isdigit():
+            return int(total)
+    try:
+        return int(response.headers.get('Content-Length'))
+    except (TypeError, ValueError):
+        return None
+
+
+# 可选的链接校验方式：get - 完整 GET 请求；head - HEAD 优先（失败回退 Range GET）
+LINK_VALIDATION_MODES = ['get', 'head']
 
 
 # 基于链接特征的轻量级重要性评估
@@ -157,6 +357,15 @@ class CriticalLinkDetector:
 
         return min(max(score, 0.0), 1.0)
 
+    def calculate_links_importance(self, links, base_domain=None, original_domain=None):
+        """
+        批量计算链接重要性得分（结果与逐个调用 calculate_link_importance 一致）
+
+        返回:
+            np.ndarray - 与 links 顺序一致的得分
+        """
+        return BatchLinkScorer(self.analyzer, original_domain).scores(links)
+
     def _analyze_text_content(self, url_text):
         """用URL路径近似替代链接文本分析"""
         from urllib.parse import unquote, urlparse
@@ -212,7 +421,7 @@ class CriticalLinkDetector:
 
 def get_ip_address(domain):
     """
-    获取域名的IPv4地址
+    获取域名的IPv4地址（经进程内 DNS 缓存，每个主机在 TTL 内只解析一次）
 
     参数:
         domain: str - 域名
@@ -220,16 +429,7 @@ def get_ip_address(domain):
     返回:
         str - IPv4地址，失败返回 None
     """
-    try:
-        # 使用 socket.gethostbyname 获取IPv4地址
-        ip_address = socket.gethostbyname(domain)
-        return ip_address
-    except socket.gaierror as e:
-        print(f"获取IP地址失败 {domain}: {e}")
-        return None
-    except Exception as e:
-        print(f"获取IP地址异常 {domain}: {e}")
-        return None
+    return dns_cache.resolve(domain)
 
 
 def screenshot_page(url, save_dir):
@@ -337,138 +537,349 @@ def screenshot_page(url, save_dir):
         return None
 
 
-def get_all_links(url, depth=3, exclude=None, visited=None):
-    """
-    递归爬取链接（支持增量爬取）
+# 二进制内容类型：不读取响应体
+BINARY_TYPES = [
+    'image/', 'video/', 'audio/', 'application/pdf',
+    'application/zip', 'application/x-rar', 'application/octet-stream',
+    'font/', 'application/x-font', 'application/vnd.ms-fontobject'
+]
 
-    参数:
-        url: str - 需要爬虫处理的 url 链接
-        depth: int - 需要爬虫处理的深度
-        exclude: set - 需要排除的 url 集合（用于增量更新策略）
-        visited: set - 已访问的 url 集合（避免重复爬取）
+# 可解析的 HTML/XML 内容类型
+PARSEABLE_TYPES = ['text/html', 'application/xhtml', 'text/xml', 'application/xml', 'application/rss', 'application/atom']
+
+# 单个页面默认最大读取字节数（可按网站通过 max_body_bytes 配置）
+DEFAULT_MAX_BODY_BYTES = 5 * 1024 * 1024
+
+
+def is_parseable_content_type(content_type):
+    """
+    根据 Content-Type 判断页面是否需要解析
 
     返回:
-        links: list[str] - 爬到的 links
+        tuple: (是否可解析, 跳过原因)
     """
-    if depth == 0:
-        return []
+    content_type = (content_type or '').lower()
+    if any(bt in content_type for bt in BINARY_TYPES):
+        return False, '跳过二进制文件'
 
-    # 初始化 exclude 和 visited
-    if exclude is None:
-        exclude = set()
-    if visited is None:
-        visited = set()
+    # 只解析 HTML/XML 类型的内容
+    if content_type and not any(pt in content_type for pt in PARSEABLE_TYPES):
+        # 如果有明确的 Content-Type 但不是可解析类型，跳过
+        if 'text/' not in content_type and 'application/' in content_type:
+            return False, '跳过不可解析的内容'
 
-    # 如果当前 URL 在排除列表中或已访问，则跳过
-    if url in exclude or url in visited:
-        return []
+    return True, None
 
-    # 标记为已访问
-    visited.add(url)
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-    }
+def read_body(response, max_bytes, should_stop=None):
+    """
+    分块读取流式响应体，超过 max_bytes 或任务被取消时中止
 
-    response = safe_request(url, headers)
-    if not response:
-        print(f"{url} 无响应")
-        return []
+    返回:
+        bytes - 响应体；超出上限、被取消或读取失败返回 None
+    """
+    chunks = []
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            if should_stop is not None and should_stop():
+                return None
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                return None
+            chunks.append(chunk)
+    except requests.exceptions.RequestException as e:
+        print(f"读取响应体失败: {response.url} - {str(e)}")
+        return None
+    return b''.join(chunks)
 
-    # 检查内容类型，跳过二进制文件
-    content_type = response.headers.get('Content-Type', '').lower()
-    binary_types = [
-        'image/', 'video/', 'audio/', 'application/pdf',
-        'application/zip', 'application/x-rar', 'application/octet-stream',
-        'font/', 'application/x-font', 'application/vnd.ms-fontobject'
-    ]
-    if any(bt in content_type for bt in binary_types):
-        print(f"跳过二进制文件: {url} (Content-Type: {content_type})")
-        return []
 
-    # 只解析 HTML/XML 类型的内容
-    parseable_types = ['text/html', 'application/xhtml', 'text/xml', 'application/xml', 'application/rss', 'application/atom']
-    if content_type and not any(pt in content_type for pt in parseable_types):
-        # 如果有明确的 Content-Type 但不是可解析类型，跳过
-        if 'text/' not in content_type and 'application/' in content_type:
-            print(f"跳过不可解析的内容: {url} (Content-Type: {content_type})")
-            return []
+def parse_page_links(content, content_type, base_url):
+    """
+    解析页面内容并提取其中的全部链接
 
-    base_url = response.url
-    soup = safe_soup(response.content, response.headers.get('Content-Type', ''))
+    HTML 使用 lxml 事件解析单次提取（不构建文档树）；XML 或事件解析失败时
+    回退到 BeautifulSoup 解析后单次遍历提取。
+
+    返回:
+        set[str] - 绝对地址链接集合；无法解析返回 None
+    """
+    text = decode_content(content, content_type, host_of(base_url))
+    if text and not is_xml_content(text, content_type):
+        try:
+            return {link for _, _, link in extract_links_from_html(text, base_url)}
+        except Exception:
+            pass
+
+    soup = safe_soup(text, content_type)
     if not soup:
-        print(f"无法解析 {url} 的内容")
-        return []
+        return None
+    return {link for _, _, link in extract_links(soup, base_url)}
+
 
-    # 定义需要检查的HTML元素和属性
-    elements_to_check = {
-        'a': ['href'],
-        'img': ['src', 'srcset', 'data-src', 'data-srcset'],
-        'script': ['src'],
-        'link': ['href'],
-        'video': ['src', 'poster', 'data-src'],
-        'audio': ['src', 'data-src'],
-        'iframe': ['src', 'data-src'],
-        'source': ['src', 'srcset', 'data-src'],
-        'embed': ['src', 'data-src'],
-        'track': ['src'],
-        'object': ['data']
-    }
-
-    links = set()
-
-    # 提取所有链接
-    for tag, attributes in elements_to_check.items():
-        for element in soup.find_all(tag):
-            for attr in attributes:
-                if element.has_attr(attr):
-                    value = element[attr].strip()
-                    if not value:
-                        continue
-
-                    if attr in ['srcset', 'data-srcset']:
-                        parts = [p.strip() for p in value.split(',') if p.strip()]
-                        for part in parts:
-                            url_part = part.split()[0]
-                            absolute_url = urljoin(base_url, url_part)
-                            links.add(absolute_url)
-                    else:
-                        absolute_url = urljoin(base_url, value)
-                        links.add(absolute_url)
-
-    # 过滤有效链接
+def valid_page_links(links):
+    """保留 http/https 链接并跳过 js/css 资源"""
     valid_schemes = ['http', 'https']
     invalid_file = ['.js', '.css']
 
     valid_links = []
     for link in links:
-        # 跳过排除列表中的链接
-        if link in exclude:
-            continue
         if urlparse(link).scheme in valid_schemes:
             if not any(ext in link for ext in invalid_file):
                 valid_links.append(link)
+    return sorted(valid_links)
+
+
+def extract_page_links(content, content_type, base_url, url_rules=None):
+    """
+    解析页面并返回规范化后的有效链接（可在解析进程池中执行）
+
+    返回:
+        list[str] | None - 有效链接；无法解析返回 None
+    """
+    links = parse_page_links(content, content_type, base_url)
+    if links is None:
+        return None
+    # 规范化后再做排除与去重判断，避免等价 URL 被重复抓取与存储
+    return valid_page_links({canonicalize_url(link, url_rules) for link in links})
+
+
+def fetch_page_links(url, exclude=None, cache=None, max_bytes=DEFAULT_MAX_BODY_BYTES, scheduler=None,
+                     url_rules=None, validators=None, budget=None, should_stop=None, parser=None,
+                     timeouts=None, policy=None):
+    """
+    抓取单个页面并提取其中的有效链接（不递归）
+
+    以流式方式请求：先检查响应头，二进制或不可解析类型立即中止，
+    可解析页面按块读取且不超过 max_bytes。
+    传入 validators 时发送条件请求，304 直接复用上次保存的出链。
+
+    参数:
+        url: str - 页面 url
+        exclude: set - 需要排除的 url 集合
+        cache: ResponseCache - 响应元数据缓存，抓取后记录该 url 的响应信息
+        max_bytes: int - 单个页面最大读取字节数
+        scheduler: HostScheduler - 主机调度器
+        url_rules: dict - 网站的 URL 规范化规则
+        validators: ValidatorStore - 上次抓取保存的验证信息
+        budget: CrawlBudget - 爬取预算，累计下载的字节数
+        should_stop: callable - 返回 True 表示任务已被取消，中止请求与读取
+        parser: ParsePool - 可选，在解析进程池中提取链接
+        timeouts: HostTimeouts - 可选，按主机耗时确定请求超时
+        policy: FetchPolicy - 可选，瞬时错误退避重试与主机熔断
+
+    返回:
+        links: list[str] - 页面中的有效链接（已规范化）
+    """
+    if exclude is None:
+        exclude = set()
+
+    headers, stored = DEFAULT_HEADERS, None
+    if validators is not None:
+        headers, stored = validators.conditional_headers(url, DEFAULT_HEADERS)
+
+    response = safe_request(
+        url, headers, stream=True, scheduler=scheduler, should_stop=should_stop, timeouts=timeouts,
+        policy=policy
+    )
+    if not response:
+        if should_stop is not None and should_stop():
+            return []
+        if cache is not None:
+            cache.record(url, None)
+        print(f"{url} 无响应")
+        return []
+
+    if stored is not None and response.status_code == 304:
+        # 页面未变化：跳过下载与解析，沿用上次的出链（按当前规则重新规范化）
+        response.close()
+        validators.mark_not_modified(stored)
+        if cache is not None:
+            cache.record_not_modified(url, response, stored)
+        links = {canonicalize_url(link, url_rules) for link in stored['out_links']}
+        return [link for link in sorted(links) if link not in exclude]
+
+    try:
+        content_type = response.headers.get('Content-Type', '')
+        parseable, reason = is_parseable_content_type(content_type)
+        if not parseable:
+            if cache is not None:
+                cache.record(url, response)
+            print(f"{reason}: {url} (Content-Type: {content_type.lower()})")
+            return []
+
+        declared_size = response_size(response)
+        if max_bytes and declared_size and declared_size > max_bytes:
+            if cache is not None:
+                cache.record(url, response)
+            print(f"跳过超大页面: {url} ({declared_size} 字节)")
+            return []
+
+        content = read_body(response, max_bytes, should_stop)
+        if content is None:
+            if should_stop is not None and should_stop():
+                return []
+            if cache is not None:
+                cache.record(url, response)
+            print(f"页面超过 {max_bytes} 字节或读取失败，已中止: {url}")
+            return []
+    finally:
+        response.close()
+
+    if budget is not None:
+        budget.add_bytes(len(content))
+
+    base_url = response.url
+    if parser is not None:
+        page_links = parser.parse(content, content_type, base_url, url_rules)
+    else:
+        page_links = extract_page_links(content, content_type, base_url, url_rules)
+    if page_links is None:
+        if cache is not None:
+            cache.record(url, response, len(content))
+        print(f"无法解析 {url} 的内容")
+        return []
+
+    if cache is not None:
+        cache.record(url, response, len(content), out_links=page_links)
+
+    # 跳过排除列表中的链接
+    return [link for link in page_links if link not in exclude]
+
+
+def get_all_links(url, depth=3, exclude=None, visited=None, workers=10, fetch_links=None, seeds=None,
+                  budget=None, should_stop=None, checkpoint=None, resume=None, rank=None):
+    """
+    逐层爬取链接（广度优先，支持增量爬取）
+
+    每一层的 url 通过线程池并发抓取，该层完成后再进入下一层，
+    深度语义与原递归实现一致：深度为 depth 时抓取距入口 depth-1 层以内的页面。
+
+    参数:
+        url: str - 需要爬虫处理的 url 链接
+        depth: int - 需要爬虫处理的深度
+        exclude: set - 需要排除的 url 集合（用于增量更新策略）
+        visited: set - 已访问的 url 集合（避免重复爬取）
+        workers: int - 每层并发抓取的线程数
+        fetch_links: callable - 单页抓取函数 fetch_links(url, exclude)，默认为 fetch_page_links
+        seeds: list[str] - 额外的种子 url（如站点地图），视为入口页面发现的链接
+        budget: CrawlBudget - 爬取预算，用尽后不再抓取新页面、不再接受新链接
+        should_stop: callable - 返回 True 表示任务已被取消，取消后立即停止遍历
+        checkpoint: CrawlCheckpoint - 可选，定期保存遍历进度
+        resume: dict - 可选，从检查点恢复的遍历状态
+        rank: callable - 可选，rank(urls) 返回按优先级从高到低排列的 url；
+              每层先抓取高分页面，预算不足时优先接受高分链接
+
+    返回:
+        links: list[str] - 爬到的 links
+    """
+    # 初始化 exclude 和 visited
+    if exclude is None:
+        exclude = set()
+    if visited is None:
+        visited = set()
+
+    if fetch_links is None:
+        fetch_links = fetch_page_links
 
-    # 递归爬取子链接
-    all_links = list(valid_links)
-    if depth > 1:
-        for link in valid_links:
-            # 传递 exclude 和 visited 集合，避免重复爬取
-            sub_links = get_all_links(link, depth=depth-1, exclude=exclude, visited=visited)
-            all_links.extend(sub_links)
+    def cancelled():
+        return should_stop is not None and should_stop()
+
+    def fetch(page_url):
+        if cancelled():
+            return []
+        if budget is not None and not budget.start_page():
+            return []
+        try:
+            return fetch_links(page_url, exclude)
+        except Exception as e:
+            # 单个页面异常不影响整次遍历（与 async 引擎一致）
+            print(f"抓取异常: {page_url} - {e}")
+            return []
+
+    def admit(links):
+        if budget is None:
+            return links
+        return budget.admit(rank(links) if rank is not None else links)
+
+    if resume:
+        # 从检查点继续：本层只抓取尚未完成的 url
+        level = resume['level']
+        frontier = resume['frontier']
+        level_found = resume['level_found']
+        all_links = resume['all_links']
+        visited.update(resume['visited'])
+    else:
+        level = 0
+        frontier = next_frontier([url], exclude, visited)
+        level_found = []
+        all_links = []
+
+    executor = ThreadPoolExecutor(max_workers=max(1, int(workers)))
+    try:
+        # 检查点可能保存于某层最后一个 url 完成之后、该层收尾之前（frontier 为空而 level_found 非空），
+        # 此时仍需执行一次该层的收尾（合并链接、生成下一层）
+        while (frontier or level_found) and level < depth and not cancelled():
+            found, level_found = level_found, []
+            # 按主机轮转排列，避免同一主机的请求扎堆占满线程池；
+            # 主机按其最高分 url 的先后轮转，同一主机内保持 frontier 的得分顺序
+            ordered = interleave_by_host(frontier)
+            futures = [executor.submit(fetch, u) for u in ordered]
+            for done, links in enumerate(iter_results(futures, should_stop), 1):
+                found.extend(admit(links))
+                if checkpoint is not None and checkpoint.due():
+                    save_checkpoint(checkpoint, level, ordered[done:], found, all_links, visited)
+            if level == 0 and seeds:
+                found.extend(admit([link for link in seeds if link not in exclude]))
+            all_links.extend(found)
+            level += 1
+            frontier = next_frontier(found, exclude, visited, rank) if level < depth else []
+            if frontier and budget is not None and budget.exhausted():
+                break
+            if checkpoint is not None and not cancelled():
+                save_checkpoint(checkpoint, level, frontier, [], all_links, visited, force=True)
+    finally:
+        # 取消时不等待排队中的任务
+        executor.shutdown(wait=not cancelled(), cancel_futures=True)
 
     return all_links
 
 
-def crawler_link(url, depth=3, exclude=None, original_domain=None, threads=10):
+def crawler_link(url, depth=3, exclude=None, original_domain=None, threads=10,
+                 engine='recursive', concurrency=20, validation='get',
+                 max_body_bytes=DEFAULT_MAX_BODY_BYTES, stats=None,
+                 host_max_concurrency=DEFAULT_HOST_MAX_CONCURRENCY, host_min_delay=DEFAULT_HOST_MIN_DELAY,
+                 url_rules=None, validators=None, seeds=None, budget=None, should_stop=None,
+                 checkpoint=None, resume=None, parse_workers=0,
+                 timeout_min=DEFAULT_TIMEOUT_MIN, timeout_max=DEFAULT_TIMEOUT_MAX,
+                 max_retries=DEFAULT_MAX_RETRIES, breaker_threshold=DEFAULT_BREAKER_THRESHOLD):
     """
     爬虫主函数 - API调用入口（支持增量爬取，链接处理多线程）
 
     参数:
         url: str - 需要爬虫的 url 链接
         depth: int - 爬虫的深度
-        exclude: list[str] - 需要排除的 url (用于增量更新策略)
+        exclude: list[str] | set - 需要排除的 url (用于增量更新策略)，也可传入 SeenUrlSet
         threads: int - 并发线程数
+        engine: str - 爬取引擎 (recursive/async)
+        concurrency: int - async 引擎同时在途的请求数
+        validation: str - 未抓取链接的校验方式 (get/head)
+        max_body_bytes: int - 单个页面最大读取字节数
+        stats: dict - 可选，用于回填爬取过程统计（请求耗时等）
+        host_max_concurrency: int - 每个主机的最大并发请求数
+        host_min_delay: float - 同一主机相邻请求的最小间隔（秒）
+        url_rules: dict - 网站的 URL 规范化规则
+        validators: ValidatorStore - 可选，启用基于 ETag/Last-Modified 的条件请求
+        seeds: list[str] - 额外的种子 url（如站点地图中的页面）
+        budget: CrawlBudget - 爬取预算（页面数、链接数、字节数、耗时），在遍历过程中生效
+        should_stop: callable - 返回 True 表示任务已被取消，遍历与链接校验随即停止
+        checkpoint: CrawlCheckpoint - 可选，定期保存遍历进度
+        resume: dict - 可选，从检查点恢复的遍历状态（跳过已完成的部分）
+        parse_workers: int - 解析进程数，大于 0 时页面解析在进程池中执行，0 表示在抓取线程内解析
+        timeout_min: float - 自适应请求超时的下限（秒）
+        timeout_max: float - 自适应请求超时的上限（秒）
+        max_retries: int - 瞬时错误（超时、连接失败、5xx）的最大重试次数
+        breaker_threshold: int - 主机连续失败多少次后熔断
     返回:
         tuple: (results, valid_rate, precision_rate, screenshot_path)
         - results: list[dict] - [{'link': str, 'content_path': str}, ...]
@@ -477,7 +888,7 @@ def crawler_link(url, depth=3, exclude=None, original_domain=None, threads=10):
         - screenshot_path: str - 截图路径
     """
     # 获取所有链接
-    print(f"开始爬取: {url}, 深度: {depth}")
+    print(f"开始爬取: {url}, 深度: {depth}, 引擎: {engine}")
 
     # 创建保存目录（使用 UUID 生成唯一目录名）
     domain = urlparse(url).netloc
@@ -486,9 +897,10 @@ def crawler_link(url, depth=3, exclude=None, original_domain=None, threads=10):
     os.makedirs(save_dir, exist_ok=True)
     print(f"保存目录: {save_dir}")
 
-    # 初始化链接重要性检测器
+    # 初始化链接重要性检测器：得分在发现链接时计算并缓存，用于优先抓取高分页面
     detector = CriticalLinkDetector()
     base_domain = domain
+    scores = LinkScoreCache(detector, base_domain=base_domain, original_domain=original_domain)
 
     # 对入口页面进行截图
     screenshot_path = None
@@ -498,10 +910,64 @@ def crawler_link(url, depth=3, exclude=None, original_domain=None, threads=10):
         print(f"入口页面截图失败 {url}: {e}")
 
     # 转换 exclude 为 set 以提高查找效率
-    exclude_set = set(exclude) if exclude else set()
-
-    # 调用 get_all_links 获取所有链接（已自动排除 exclude 中的链接）
-    all_links = get_all_links(url, depth, exclude=exclude_set)
+    if exclude is None:
+        exclude_set = set()
+    elif isinstance(exclude, (list, tuple)):
+        exclude_set = set(exclude)
+    else:
+        # 已是集合或支持 in 查询的对象（如 SeenUrlSet）
+        exclude_set = exclude
+
+    # 共享连接池大小与并发线程数保持一致
+    get_session(pool_maxsize=max(int(threads), int(concurrency)))
+
+    # 响应元数据缓存：遍历阶段抓取过的 url 在 process_link 中不再重复请求
+    response_cache = ResponseCache()
+    dns_stats_before = dns_cache.stats()
+
+    # 主机调度器：限制单个主机的并发与请求频率，遵循 429/503
+    scheduler = HostScheduler(max_per_host=host_max_concurrency, min_delay=host_min_delay)
+
+    # 自适应超时：按主机响应耗时确定连接与读取超时
+    timeouts = HostTimeouts(min_timeout=timeout_min, max_timeout=timeout_max)
+
+    # 抓取策略：瞬时错误退避重试，连续失败的主机熔断后快速失败
+    policy = FetchPolicy(max_retries=max_retries, breaker_threshold=breaker_threshold)
+
+    # 解析进程池：多核并行解析页面，抓取线程只负责网络 I/O
+    parser = ParsePool(parse_workers) if parse_workers else None
+
+    fetch_links = partial(
+        fetch_page_links, cache=response_cache, max_bytes=max_body_bytes,
+        scheduler=scheduler, url_rules=url_rules, validators=validators, budget=budget,
+        should_stop=should_stop, parser=parser, timeouts=timeouts, policy=policy
+    )
+
+    # 获取所有链接（已自动排除 exclude 中的链接，链接均为规范化形式）
+    seed_url = canonicalize_url(url, url_rules)
+    if seeds:
+        seeds = valid_page_links({canonicalize_url(link, url_rules) for link in seeds})
+    if resume and budget is not None:
+        # 恢复前已发现的链接计入链接预算
+        budget.admit(resume['all_links'] + resume['level_found'])
+    try:
+        if engine == 'async':
+            all_links = crawl_links(
+                fetch_links, seed_url, depth, exclude=exclude_set, concurrency=concurrency, scheduler=scheduler,
+                seeds=seeds, budget=budget, should_stop=should_stop, checkpoint=checkpoint, resume=resume,
+                rank=scores.rank
+            )
+        else:
+            all_links = get_all_links(
+                seed_url, depth, exclude=exclude_set, workers=threads, fetch_links=fetch_links, seeds=seeds,
+                budget=budget, should_stop=should_stop, checkpoint=checkpoint, resume=resume,
+                rank=scores.rank
+            )
+    finally:
+        if parser is not None:
+            parser.shutdown()
+    if budget is not None and budget.stop_reason:
+        print(f"爬取预算用尽（{budget.stop_reason}），已停止遍历")
 
     # 去重
     unique_links = list(set(all_links))
@@ -514,16 +980,31 @@ def crawler_link(url, depth=3, exclude=None, original_domain=None, threads=10):
 
     def process_link(link: str):
         print(f"处理链接: {link}")
-        link_domain = urlparse(link).netloc
-        ip_address = get_ip_address(link_domain)
-        importance_score = detector.calculate_link_importance(link, base_domain=base_domain, original_domain=original_domain)
-
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-        }
-        response = safe_request(link, headers)
+        parsed_link = urlparse(link)
+        ip_address = get_ip_address(parsed_link.hostname or parsed_link.netloc)
+        importance_score = scores.score(link)
+        is_ad_domain = ad_domains.is_ad_host(parsed_link.hostname)
+
+        # 优先复用遍历阶段记录的响应信息，仅对未抓取过的 url 发起请求
+        meta = response_cache.get(link)
+        if meta is None:
+            if validation == 'head':
+                response = safe_head_request(
+                    link, DEFAULT_HEADERS, scheduler=scheduler, should_stop=should_stop, timeouts=timeouts,
+                    policy=policy
+                )
+                meta = response_cache.record(link, response, response_size(response) if response else None)
+            else:
+                # 只需状态码与内容类型：流式请求后立即关闭，不下载响应体
+                response = safe_request(
+                    link, DEFAULT_HEADERS, stream=True, scheduler=scheduler, should_stop=should_stop,
+                    timeouts=timeouts, policy=policy
+                )
+                if response:
+                    response.close()
+                meta = response_cache.record(link, response, response_size(response) if response else None)
 
-        if response:
+        if meta['ok']:
             filename = re.sub(illegal_chars, '', link)
             if len(filename) > 200:
                 filename = filename[:200]
@@ -531,10 +1012,15 @@ def crawler_link(url, depth=3, exclude=None, original_domain=None, threads=10):
             return {
                 'link': link,
                 'content_path': save_path,
-                'status_code': response.status_code,
-                'content_type': response.headers.get('Content-Type', ''),
+                'status_code': meta['status_code'],
+                'content_type': meta['content_type'],
                 'ip_address': ip_address,
-                'importance_score': round(importance_score, 4)
+                'importance_score': round(importance_score, 4),
+                'is_ad_domain': is_ad_domain,
+                'etag': meta['etag'],
+                'last_modified': meta['last_modified'],
+                'content_length': meta['content_length'],
+                'out_links': meta['out_links']
             }
         else:
             return {
@@ -543,12 +1029,40 @@ def crawler_link(url, depth=3, exclude=None, original_domain=None, threads=10):
                 'status_code': None,
                 'content_type': '',
                 'ip_address': ip_address,
-                'importance_score': round(importance_score, 4)
+                'importance_score': round(importance_score, 4),
+                'is_ad_domain': is_ad_domain
             }
 
-    with ThreadPoolExecutor(max_workers=max(1, int(threads))) as executor:
-        for res in executor.map(process_link, unique_links):
+    executor = ThreadPoolExecutor(max_workers=max(1, int(threads)))
+    try:
+        futures = [executor.submit(process_link, link) for link in interleave_by_host(unique_links)]
+        for res in iter_results(futures, should_stop):
             results.append(res)
+    finally:
+        cancelled = should_stop is not None and should_stop()
+        executor.shutdown(wait=not cancelled, cancel_futures=True)
+    if cancelled:
+        print(f"任务已取消，停止链接校验（已处理 {len(results)} 个）")
+
+    print(f"响应缓存: 命中 {response_cache.hits} 次, 未命中 {response_cache.misses} 次")
+    if stats is not None:
+        stats['requests'] = response_cache.latency_summary()
+        stats['host_scheduler'] = scheduler.stats()
+        stats['timeouts'] = timeouts.stats()
+        stats['fetch_policy'] = policy.stats()
+        stats['link_scores'] = scores.stats()
+        dns_stats = dns_cache.stats()
+        stats['dns'] = {
+            key: dns_stats[key] - dns_stats_before[key]
+            for key in ('hits', 'negative_hits', 'misses')
+        }
+        if validators is not None:
+            stats['revalidation'] = validators.stats()
+        if budget is not None:
+            stats['budget'] = budget.stats()
+        if parser is not None:
+            stats['parse_pool'] = parser.stats()
+        stats['ad_domains'] = dict(ad_domains.stats(), ad_links=sum(1 for r in results if r.get('is_ad_domain')))
 
     # 计算指标
     total_links = len(results)
@@ -562,12 +1076,9 @@ def crawler_link(url, depth=3, exclude=None, original_domain=None, threads=10):
             if r.get('importance_score') < 0.8:
                 invalid_links_count += 1
                 r['link_type'] = 'invalid'
-            else:
-                # 仅当域名在 domain.json 中时才计入 err_link
-                domain = r.get('url', '')
-                # if domain and domain in domain_set:
-                if 'ad' in domain.lower() or 'ads' in domain.lower():
-                    err_link += 1
+            elif r.get('is_ad_domain'):
+                # 仅当链接主机属于 domain.json 中的广告/跟踪域名时才计入 err_link
+                err_link += 1
     # valid_links = len([r for r in results if r.get('content_path')])
     # invalid_links = total_links - valid_links
     valid_rate = round(((valid_links_count - invalid_links_count) / valid_links_count), 4) if valid_links_count else 1.0
@@ -591,7 +1102,8 @@ class CrawlerService:
     def __init__(self):
         self.db = get_db()
 
-    def crawl(self, task_id, website_id, strategy='incremental', depth=3, max_links=1000):
+    def crawl(self, task_id, website_id, strategy='incremental', depth=3, max_links=1000,
+              engine='recursive', concurrency=20, resume=False, runner_id=None):
         """
         执行爬取任务
 
@@ -601,54 +1113,117 @@ class CrawlerService:
             strategy: str - 爬取策略 (incremental/full)
             depth: int - 爬取深度
             max_links: int - 最大链接数
+            engine: str - 爬取引擎 (recursive/async)
+            concurrency: int - async 引擎同时在途的请求数
+            resume: bool - 任务已由 worker 认领（状态已是 running）；存在检查点时从检查点继续，
+                           任务参数以检查点中记录的为准
+            runner_id: str - 认领任务时写入的租约标识；缺省时新生成并由本次执行认领任务
 
         返回:
             dict - 爬取结果统计
         """
+        # 清除之前的停止标志(如果存在)；本次执行只使用自己的停止信号与租约标识，
+        # 同一进程中先前（已失去租约）的执行不会影响本次执行
+        app_global.clear_stop_flag(task_id)
+        stop_event = app_global.get_stop_event(task_id)
+        runner_id = runner_id or new_lease_id()
+        checkpoint = CrawlCheckpoint(self.db, task_id, runner_id=runner_id, stop_event=stop_event)
         try:
-            # 清除之前的停止标志(如果存在)
-            app_global.clear_stop_flag(task_id)
-
-            # 更新任务状态为 running
-            self.db.crawl_tasks.update_one(
-                {'_id': task_id},
-                CrawlTaskModel.update_status('running')
-            )
-
-            # 记录日志
-            self._log(task_id, 'INFO', f'开始爬取任务 - 策略: {strategy}')
 
             # 获取网站信息
             website = self.db.websites.find_one({'_id': website_id})
-            original_domain = website['domain']
-
             if not website:
                 raise Exception(f"网站不存在: {website_id}")
+            original_domain = website['domain']
+
+            resume_state = None
+            if resume:
+                params, resume_state = checkpoint.load()
+                if params is not None:
+                    strategy, depth, max_links = params['strategy'], params['depth'], params['max_links']
+                    engine, concurrency = params['engine'], params['concurrency']
+            else:
+                # 更新任务状态为 running（记录执行进程，便于识别遗留任务）
+                self.db.crawl_tasks.update_one(
+                    {'_id': task_id},
+                    CrawlTaskModel.claim(runner_id)
+                )
+
+            if resume_state is None:
+                checkpoint.start(website_id, {
+                    'strategy': strategy,
+                    'depth': depth,
+                    'max_links': max_links,
+                    'engine': engine,
+                    'concurrency': concurrency
+                })
+            checkpoint.start_heartbeat()
+
+            # 记录日志
+            if resume_state is not None:
+                self._log(task_id, 'INFO', f'从检查点恢复爬取任务 - 第 {resume_state["level"] + 1} 层, '
+                                           f'剩余 {len(resume_state["frontier"])} 个待抓取页面')
+            else:
+                self._log(task_id, 'INFO', f'开始爬取任务 - 策略: {strategy}, 引擎: {engine}')
 
             url = website['url']
 
+            # 加载网站的已爬取 URL 过滤器（保存结果时同步更新）
+            seen_filter = load_seen_filter(self.db, website_id)
+
             # 根据策略准备 exclude 列表
             exclude_urls = []
             if strategy == 'incremental':
-                # 增量策略：查询已爬取的链接
-                crawled_docs = self.db.crawled_links.find(
-                    {'website_id': website_id},
-                    {'url': 1}
-                )
-                exclude_urls = [doc['url'] for doc in crawled_docs]
+                # 增量策略：布隆过滤器判断已爬取的链接，命中时再精确查询数据库
+                exclude_urls = SeenUrlSet(self.db, website_id, seen_filter)
                 self._log(task_id, 'INFO', f'增量模式：排除 {len(exclude_urls)} 个已存在链接')
             else:
                 # 全量策略：不排除任何链接
                 self._log(task_id, 'INFO', '全量模式：爬取所有链接')
 
+            # 读取站点地图作为额外种子（解析结果按网站缓存）
+            crawl_stats = {}
+            seeds = None
+            if website.get('use_sitemap', True):
+                seeds = self._sitemap_seeds(task_id, website, strategy, max_links, crawl_stats)
+
+            # 爬取预算在遍历过程中生效，超出 max_links 的链接不再抓取与校验
+            budget = CrawlBudget(
+                max_pages=website.get('max_pages'),
+                max_links=max_links,
+                max_bytes=website.get('max_crawl_bytes'),
+                max_seconds=website.get('max_crawl_seconds')
+            )
+
             # 执行爬取
-            results, valid_rate, precision_rate, screenshot_path,valid_links,invalid_links = crawler_link(url, depth, exclude_urls, original_domain)
+            results, valid_rate, precision_rate, screenshot_path,valid_links,invalid_links = crawler_link(
+                url, depth, exclude_urls, original_domain, engine=engine, concurrency=concurrency,
+                validation=website.get('link_validation', 'get'),
+                max_body_bytes=website.get('max_body_bytes', DEFAULT_MAX_BODY_BYTES),
+                stats=crawl_stats,
+                host_max_concurrency=website.get('host_max_concurrency', DEFAULT_HOST_MAX_CONCURRENCY),
+                host_min_delay=website.get('host_min_delay', DEFAULT_HOST_MIN_DELAY),
+                url_rules=website.get('url_rules'),
+                validators=ValidatorStore(self.db, website_id),
+                seeds=seeds,
+                budget=budget,
+                should_stop=stop_event,
+                checkpoint=checkpoint,
+                resume=resume_state,
+                parse_workers=website.get('parse_workers', 0),
+                timeout_min=website.get('request_timeout_min', DEFAULT_TIMEOUT_MIN),
+                timeout_max=website.get('request_timeout_max', DEFAULT_TIMEOUT_MAX),
+                max_retries=website.get('fetch_max_retries', DEFAULT_MAX_RETRIES),
+                breaker_threshold=website.get('breaker_threshold', DEFAULT_BREAKER_THRESHOLD)
+            )
             total_links = len(results)
+            if budget.stop_reason:
+                self._log(task_id, 'INFO', f'爬取预算用尽，提前结束遍历: {budget.stop_reason}')
 
             # 检查是否需要停止（任务可能已被强制取消）
-            if app_global.should_stop(task_id):
+            if stop_event.is_set():
                 self._log(task_id, 'INFO', '检测到取消信号，停止执行')
-                app_global.clear_stop_flag(task_id)
+                app_global.clear_stop_flag(task_id, stop_event)
                 return {
                     'total_links': 0,
                     'valid_links': 0,
@@ -658,11 +1233,11 @@ class CrawlerService:
                     'precision_rate': 0
                 }
 
-            # 保存爬取结果到数据库
-            new_links = 0
+            # 保存爬取结果到数据库（批量 upsert，新插入的链接计为新增）
+            writer = CrawledLinkWriter(self.db)
             for result in results[:max_links]:  # 限制最大链接数
                 # 检查是否需要停止
-                if app_global.should_stop(task_id):
+                if stop_event.is_set():
                     self._log(task_id, 'INFO', '检测到取消信号，停止保存')
                     break
 
@@ -679,35 +1254,27 @@ class CrawlerService:
                     content_type=result.get('content_type'),
                     source_url=url,
                     ip_address=result.get('ip_address'),
-                    importance_score=result.get('importance_score')
+                    importance_score=result.get('importance_score'),
+                    is_ad_domain=result.get('is_ad_domain'),
+                    etag=result.get('etag'),
+                    last_modified=result.get('last_modified'),
+                    content_length=result.get('content_length'),
+                    out_links=result.get('out_links')
                 )
 
-                # 若存在相同链接：删除旧数据后插入新数据
-                existing_link = self.db.crawled_links.find_one({
-                    'website_id': website_id,
-                    'url': link_url
-                })
-                if existing_link:
-                    self.db.crawled_links.delete_one({'_id': existing_link['_id']})
-                    try:
-                        self.db.crawled_links.insert_one(link_doc)
-                    except DuplicateKeyError:
-                        # 并发竞争导致再次重复：强制清理后重插一次
-                        self.db.crawled_links.delete_many({'website_id': website_id, 'url': link_url})
-                        self.db.crawled_links.insert_one(link_doc)
-                    # 覆盖不计入 new_links
-                else:
-                    # 不存在则直接插入；若并发下重复，则按规则删除后重插
-                    try:
-                        self.db.crawled_links.insert_one(link_doc)
-                        new_links += 1
-                    except DuplicateKeyError:
-                        self.db.crawled_links.delete_many({'website_id': website_id, 'url': link_url})
-                        self.db.crawled_links.insert_one(link_doc)
-                        # 并发覆盖不计入 new_links
+                writer.add(link_doc)
+                seen_filter.add(link_url)
+
+            writer.flush()
+            new_links = writer.upserted
+            crawl_stats['link_writer'] = writer.stats()
 
+            # 持久化已爬取 URL 过滤器
+            save_seen_filter(self.db, website_id, seen_filter)
+            if isinstance(exclude_urls, SeenUrlSet):
+                crawl_stats['seen_filter'] = exclude_urls.stats()
 
-            # 更新任务统计和截图路径
+            # 更新任务统计和截图路径（只更新本次执行仍持有的任务）
             update_data = CrawlTaskModel.update_statistics(
                 total_links=total_links+invalid_links,
                 valid_links=valid_links,
@@ -715,30 +1282,31 @@ class CrawlerService:
                 new_links=new_links,
                 valid_rate = valid_rate,
                 precision_rate = precision_rate,
+                crawl_stats=crawl_stats,
             )
             # 添加截图路径
             if screenshot_path:
                 update_data['$set']['screenshot_path'] = screenshot_path
 
             self.db.crawl_tasks.update_one(
-                {'_id': task_id},
+                {'_id': task_id, 'runner_id': runner_id},
                 update_data
             )
 
             # 检查是否被取消（任务可能在保存过程中被取消）
-            if app_global.should_stop(task_id):
+            if stop_event.is_set():
                 self._log(task_id, 'INFO', f'任务已取消 - 已处理: {new_links} 个链接')
-                app_global.clear_stop_flag(task_id)
+                app_global.clear_stop_flag(task_id, stop_event)
             else:
                 # 更新任务状态为 completed
                 self.db.crawl_tasks.update_one(
-                    {'_id': task_id},
+                    {'_id': task_id, 'runner_id': runner_id, 'status': 'running'},
                     CrawlTaskModel.update_status('completed')
                 )
                 # 记录日志
                 self._log(task_id, 'INFO', f'爬取任务完成 - 总链接: {total_links}, 新增: {new_links}')
                 # 清除停止标志
-                app_global.clear_stop_flag(task_id)
+                app_global.clear_stop_flag(task_id, stop_event)
 
             return {
                 'total_links': total_links,
@@ -750,9 +1318,9 @@ class CrawlerService:
             }
 
         except Exception as e:
-            # 更新任务状态为 failed
+            # 更新任务状态为 failed（任务已由其他 worker 接管时不修改）
             self.db.crawl_tasks.update_one(
-                {'_id': task_id},
+                {'_id': task_id, 'runner_id': runner_id},
                 CrawlTaskModel.update_status('failed', error_message=str(e))
             )
 
@@ -760,10 +1328,52 @@ class CrawlerService:
             self._log(task_id, 'ERROR', f'爬取任务失败: {str(e)}')
 
             # 清除停止标志
-            app_global.clear_stop_flag(task_id)
+            app_global.clear_stop_flag(task_id, stop_event)
 
             raise
 
+        finally:
+            # 任务已结束（完成、取消或失败），不再需要检查点；
+            # 租约已失去时检查点属于接管的 worker，不能删除
+            checkpoint.stop_heartbeat()
+            if not checkpoint.lease_lost:
+                checkpoint.clear()
+            app_global.clear_stop_flag(task_id, stop_event)
+
+    def _sitemap_seeds(self, task_id, website, strategy, max_links, crawl_stats):
+        """
+        读取网站站点地图并生成种子 url
+
+        增量模式下跳过上次完成的爬取之后未修改的条目。
+        """
+        website_id = website['_id']
+        try:
+            entries, from_cache = load_sitemap_entries(
+                self.db, website_id, website['url'], DEFAULT_HEADERS,
+                ttl=website.get('sitemap_ttl', DEFAULT_SITEMAP_TTL)
+            )
+        except Exception as e:
+            self._log(task_id, 'WARNING', f'站点地图读取失败: {str(e)}')
+            return None
+
+        since = None
+        if strategy == 'incremental':
+            last_task = self.db.crawl_tasks.find_one(
+                {'website_id': website_id, 'status': 'completed'},
+                sort=[('started_at', -1)]
+            )
+            if last_task:
+                since = last_task.get('started_at')
+
+        seeds = select_seeds(entries, since=since, limit=max_links)
+        crawl_stats['sitemap'] = {
+            'entries': len(entries),
+            'seeds': len(seeds),
+            'from_cache': from_cache
+        }
+        self._log(task_id, 'INFO', f'站点地图：{len(entries)} 个条目，使用 {len(seeds)} 个种子')
+        return seeds
+
     def _log(self, task_id, level, message, details=None):
         """
         记录日志到数据库
@@ -0,0 +1,105 @@
+"""
+DNS 缓存 - 进程内共享的主机名解析缓存（支持 TTL 与失败结果缓存）
+"""
+import socket
+import threading
+import time
+
+# 解析成功与解析失败结果的缓存时间（秒）
+DEFAULT_POSITIVE_TTL = 300
+DEFAULT_NEGATIVE_TTL = 60
+
+
+class DnsCache:
+    """
+    线程安全的 DNS 解析缓存
+
+    同一主机并发解析时只有一个线程真正发起查询，其余线程等待其结果；
+    解析失败的主机同样缓存（negative_ttl），避免对失效主机反复等待解析超时。
+    """
+
+    def __init__(self, positive_ttl=DEFAULT_POSITIVE_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL,
+                 resolver=socket.gethostbyname):
+        """
+        参数:
+            positive_ttl: float - 解析成功结果的缓存时间（秒）
+            negative_ttl: float - 解析失败结果的缓存时间（秒）
+            resolver: callable - 实际解析函数，返回 IPv4 地址，失败抛出异常
+        """
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.resolver = resolver
+        self._entries = {}   # host -> (ip 或 None, 过期时间)
+        self._pending = {}   # host -> threading.Event（正在解析）
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def resolve(self, host):
+        """
+        解析主机名
+
+        参数:
+            host: str - 主机名（不含端口）
+
+        返回:
+            str - IPv4 地址，解析失败返回 None
+        """
+        if not host:
+            return None
+        host = host.lower()
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(host)
+                if entry is not None and entry[1] > time.monotonic():
+                    if entry[0] is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return entry[0]
+
+                event = self._pending.get(host)
+                if event is None:
+                    # 由当前线程负责解析
+                    event = self._pending[host] = threading.Event()
+                    self.misses += 1
+                    break
+
+            # 其他线程正在解析该主机，等待结果后重新读取缓存
+            event.wait()
+
+        ip_address = None
+        try:
+            ip_address = self.resolver(host)
+        except socket.gaierror as e:
+            print(f"获取IP地址失败 {host}: {e}")
+        except Exception as e:
+            print(f"获取IP地址异常 {host}: {e}")
+        finally:
+            ttl = self.positive_ttl if ip_address else self.negative_ttl
+            with self._lock:
+                self._entries[host] = (ip_address, time.monotonic() + ttl)
+                self._pending.pop(host).set()
+
+        return ip_address
+
+    def stats(self):
+        """缓存统计：命中、失败结果命中、未命中次数与缓存主机数"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'hosts': len(self._entries)
+            }
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+
+# 全局共享的 DNS 缓存实例（同一进程内的并发任务共用）
+dns_cache = DnsCache()
@@ -0,0 +1,126 @@
+"""
+抓取策略 - 瞬时错误的有限次退避重试与按主机的熔断器
+"""
+import random
+import threading
+import time
+
+# 默认重试次数（不含首次请求）、退避基数与上限（秒）
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_MAX_RETRY_BACKOFF = 8.0
+
+# 默认熔断阈值（连续失败次数）与熔断后重新探测的间隔（秒）
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET = 30.0
+
+
+class _BreakerState:
+    __slots__ = ('failures', 'open_until', 'trips')
+
+    def __init__(self):
+        self.failures = 0
+        self.open_until = None
+        self.trips = 0
+
+
+class FetchPolicy:
+    """
+    线程安全的抓取策略（生命周期为一次爬取）
+
+    超时、连接失败（含连接重置）、429 与 5xx 视为瞬时错误，按带随机抖动的指数退避重试；
+    同一主机连续失败 breaker_threshold 次后熔断，熔断期间该主机的请求直接失败，
+    breaker_reset 秒后放行一个探测请求，成功则恢复，失败则继续熔断。
+    """
+
+    def __init__(self, max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_RETRY_BACKOFF,
+                 max_backoff=DEFAULT_MAX_RETRY_BACKOFF, breaker_threshold=DEFAULT_BREAKER_THRESHOLD,
+                 breaker_reset=DEFAULT_BREAKER_RESET):
+        """
+        参数:
+            max_retries: int - 瞬时错误的最大重试次数
+            backoff: float - 退避基数（秒），第 n 次重试的等待上限为 backoff × 2^n
+            max_backoff: float - 单次退避等待的上限（秒）
+            breaker_threshold: int - 触发熔断的连续失败次数
+            breaker_reset: float - 熔断后重新探测的间隔（秒）
+        """
+        self.max_retries = max(0, int(max_retries))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker_threshold = max(1, int(breaker_threshold))
+        self.breaker_reset = breaker_reset
+        self.retries = 0
+        self.fast_failed = 0
+        self.probes = 0
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _BreakerState()
+        return state
+
+    def allow(self, host):
+        """
+        是否允许向 host 发起请求
+
+        熔断期内返回 False；熔断到期后放行一个探测请求，
+        探测结果返回前（最长 breaker_reset 秒）其余请求仍直接失败。
+        """
+        with self._lock:
+            state = self._state(host)
+            if state.open_until is None:
+                return True
+            now = time.monotonic()
+            if now < state.open_until:
+                self.fast_failed += 1
+                return False
+            state.open_until = now + self.breaker_reset
+            self.probes += 1
+            return True
+
+    def record_success(self, host):
+        """主机有响应（包括非瞬时的错误状态码），重置失败计数并关闭熔断"""
+        with self._lock:
+            state = self._state(host)
+            state.failures = 0
+            state.open_until = None
+
+    def record_failure(self, host):
+        """记录一次瞬时错误，连续失败达到阈值时熔断该主机"""
+        with self._lock:
+            state = self._state(host)
+            state.failures += 1
+            if state.open_until is not None:
+                # 探测失败，继续熔断
+                state.open_until = time.monotonic() + self.breaker_reset
+            elif state.failures >= self.breaker_threshold:
+                state.open_until = time.monotonic() + self.breaker_reset
+                state.trips += 1
+                print(f"主机连续失败 {state.failures} 次，熔断 {self.breaker_reset:.0f} 秒: {host}")
+
+    def retry_delay(self, attempt):
+        """第 attempt 次重试（从 0 开始）前的等待时间：在 [0, backoff × 2^attempt] 内随机取值"""
+        with self._lock:
+            self.retries += 1
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def stats(self):
+        """重试与熔断统计"""
+        with self._lock:
+            tripped = {host: state.trips for host, state in self._hosts.items() if state.trips}
+            return {
+                'retries': self.retries,
+                'breaker_trips': sum(tripped.values()),
+                'tripped_hosts': tripped,
+                'fast_failed': self.fast_failed,
+                'probes': self.probes,
+                'max_retries': self.max_retries,
+                'breaker_threshold': self.breaker_threshold
+            }
+
+
+def is_transient_status(status_code):
+    """429（限流）与 5xx 视为瞬时错误；限流时主机调度器已按 Retry-After 暂停该主机，重试在暂停结束后发出"""
+    return status_code is not None and (status_code == 429 or status_code >= 500)
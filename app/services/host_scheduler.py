@@ -0,0 +1,181 @@
+"""
+主机调度器 - 按主机限制并发数与请求间隔，遵循 429/503 与 Retry-After
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# 默认每个主机的最大并发请求数与最小请求间隔（秒）
+DEFAULT_HOST_MAX_CONCURRENCY = 4
+DEFAULT_HOST_MIN_DELAY = 0.0
+
+# 触发主机退避的状态码
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def host_of(url):
+    """提取 url 的主机名（小写，含端口）"""
+    return urlparse(url).netloc.lower()
+
+
+def parse_retry_after(value):
+    """
+    解析 Retry-After 响应头
+
+    参数:
+        value: str - 秒数或 HTTP 日期
+
+    返回:
+        float - 需要等待的秒数，无法解析返回 None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class _HostState:
+    __slots__ = ('active', 'next_time', 'throttled')
+
+    def __init__(self):
+        self.active = 0
+        self.next_time = 0.0
+        self.throttled = 0
+
+
+class HostScheduler:
+    """
+    线程安全的主机级请求调度器（生命周期为一次爬取）
+
+    每个主机同时在途的请求不超过 max_per_host，相邻两次请求的开始时间
+    至少间隔 min_delay 秒；遇到 429/503 时按 Retry-After（缺省为 backoff 秒）
+    暂停该主机，其他主机不受影响。
+    """
+
+    def __init__(self, max_per_host=DEFAULT_HOST_MAX_CONCURRENCY, min_delay=DEFAULT_HOST_MIN_DELAY,
+                 backoff=5.0, max_backoff=120.0):
+        """
+        参数:
+            max_per_host: int - 每个主机的最大并发请求数
+            min_delay: float - 同一主机相邻请求的最小间隔（秒）
+            backoff: float - 429/503 且无 Retry-After 时的暂停时间（秒）
+            max_backoff: float - 单次暂停的上限（秒）
+        """
+        self.max_per_host = max(1, int(max_per_host))
+        self.min_delay = max(0.0, float(min_delay))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._hosts = {}
+        self._cond = threading.Condition()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState()
+        return state
+
+    def ready_in(self, host):
+        """
+        距离该主机可以发起下一个请求还需等待的秒数（0 表示立即可用）
+
+        并发已满时返回一个较小的轮询间隔。
+        """
+        with self._cond:
+            state = self._state(host)
+            wait = max(0.0, state.next_time - time.monotonic())
+            if state.active >= self.max_per_host:
+                return max(wait, 0.05)
+            return wait
+
+    def acquire(self, host, should_stop=None):
+        """
+        阻塞直到可以向 host 发起请求
+
+        参数:
+            host: str - 主机名
+            should_stop: callable - 可选，返回 True 时放弃等待
+
+        返回:
+            bool - 是否获取成功
+        """
+        with self._cond:
+            while True:
+                if should_stop and should_stop():
+                    return False
+                state = self._state(host)
+                now = time.monotonic()
+                if state.active < self.max_per_host and now >= state.next_time:
+                    state.active += 1
+                    state.next_time = now + self.min_delay
+                    return True
+                wait = state.next_time - now if state.active < self.max_per_host else 0.5
+                self._cond.wait(timeout=min(max(wait, 0.01), 0.5))
+
+    def release(self, host, response=None):
+        """
+        请求结束后释放主机配额
+
+        参数:
+            host: str - 主机名
+            response: requests.Response - 最终响应（无响应时为 None），
+                      429/503 时根据 Retry-After 暂停该主机
+        """
+        status_code = response.status_code if response is not None else None
+        with self._cond:
+            state = self._state(host)
+            state.active = max(0, state.active - 1)
+            if status_code in THROTTLE_STATUS_CODES:
+                delay = parse_retry_after(response.headers.get('Retry-After'))
+                if delay is None:
+                    delay = self.backoff
+                delay = min(delay, self.max_backoff)
+                state.next_time = max(state.next_time, time.monotonic() + delay)
+                state.throttled += 1
+                print(f"主机限流 [{status_code}]: {host}，暂停 {delay:.1f} 秒")
+            self._cond.notify_all()
+
+    def stats(self):
+        """调度统计：涉及主机数与被限流次数"""
+        with self._cond:
+            throttled = {h: s.throttled for h, s in self._hosts.items() if s.throttled}
+            return {
+                'hosts': len(self._hosts),
+                'throttled_responses': sum(throttled.values()),
+                'throttled_hosts': len(throttled),
+                'max_per_host': self.max_per_host,
+                'min_delay': self.min_delay
+            }
+
+
+def interleave_by_host(urls):
+    """
+    按主机轮转重排 url，使相邻任务尽量落在不同主机上
+
+    参数:
+        urls: iterable[str]
+
+    返回:
+        list[str] - 重排后的 url（同一主机内保持原有顺序）
+    """
+    buckets = {}
+    for url in urls:
+        buckets.setdefault(host_of(url), []).append(url)
+
+    queues = list(buckets.values())
+    longest = max((len(q) for q in queues), default=0)
+    ordered = []
+    for index in range(longest):
+        for queue in queues:
+            if index < len(queue):
+                ordered.append(queue[index])
+    return ordered
@@ -0,0 +1,130 @@
+"""
+自适应超时 - 按主机统计响应耗时（EWMA 与高分位数），据此确定连接与读取超时
+"""
+import threading
+from collections import deque
+
+# 默认超时上下限（秒）与尚无耗时样本时使用的初始超时
+DEFAULT_TIMEOUT_MIN = 2.0
+DEFAULT_TIMEOUT_MAX = 15.0
+DEFAULT_INITIAL_TIMEOUT = 5.0
+
+# 耗时样本窗口大小与 EWMA 平滑系数
+SAMPLE_WINDOW = 50
+EWMA_ALPHA = 0.3
+
+# 从未成功响应的主机连续超时达到该次数后，按下限超时处理（视为不可达）
+DEAD_HOST_TIMEOUTS = 2
+
+# 统计信息中列出的主机数（按读取超时从大到小）
+STATS_TOP_HOSTS = 10
+
+
+class _HostLatency:
+    __slots__ = ('ewma', 'samples', 'timeouts', 'consecutive_timeouts')
+
+    def __init__(self):
+        self.ewma = None
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+        self.timeouts = 0
+        self.consecutive_timeouts = 0
+
+    def p95(self):
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class HostTimeouts:
+    """
+    线程安全的主机级自适应超时（生命周期为一次爬取）
+
+    每次收到响应后记录响应头返回耗时，读取超时取 max(p95 × 2, EWMA × 3)，
+    连接超时取 p95 × 1.5（不超过读取超时），均限制在 [min_timeout, max_timeout] 内。
+    慢而正常的主机获得更长的超时；从未响应且多次超时的主机直接使用下限。
+    """
+
+    def __init__(self, min_timeout=DEFAULT_TIMEOUT_MIN, max_timeout=DEFAULT_TIMEOUT_MAX,
+                 initial_timeout=DEFAULT_INITIAL_TIMEOUT):
+        """
+        参数:
+            min_timeout: float - 超时下限（秒）
+            max_timeout: float - 超时上限（秒）
+            initial_timeout: float - 主机尚无耗时样本时的超时（秒）
+        """
+        self.min_timeout = max(0.1, float(min_timeout))
+        self.max_timeout = max(self.min_timeout, float(max_timeout))
+        self.initial_timeout = initial_timeout
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostLatency()
+        return state
+
+    def _clamp(self, value):
+        return min(max(value, self.min_timeout), self.max_timeout)
+
+    def _timeout(self, state):
+        """根据主机状态计算 (连接超时, 读取超时)（调用方持有锁）"""
+        if not state.samples:
+            if state.consecutive_timeouts >= DEAD_HOST_TIMEOUTS:
+                return self.min_timeout, self.min_timeout
+            initial = self._clamp(self.initial_timeout)
+            return initial, initial
+        p95 = state.p95()
+        read = self._clamp(max(p95 * 2, state.ewma * 3))
+        connect = min(self._clamp(p95 * 1.5), read)
+        return connect, read
+
+    def get(self, host):
+        """
+        返回 host 当前的超时设置
+
+        返回:
+            tuple: (connect_timeout, read_timeout) - 可直接作为 requests 的 timeout 参数
+        """
+        with self._lock:
+            return self._timeout(self._state(host))
+
+    def observe(self, host, elapsed):
+        """记录一次响应耗时（秒）"""
+        if elapsed is None:
+            return
+        with self._lock:
+            state = self._state(host)
+            state.samples.append(elapsed)
+            state.ewma = elapsed if state.ewma is None else EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * state.ewma
+            state.consecutive_timeouts = 0
+
+    def record_timeout(self, host):
+        """记录一次请求超时"""
+        with self._lock:
+            state = self._state(host)
+            state.timeouts += 1
+            state.consecutive_timeouts += 1
+
+    def stats(self):
+        """超时决策统计：各主机耗时与当前超时（只列出超时最长的若干主机）"""
+        with self._lock:
+            hosts = []
+            for host, state in self._hosts.items():
+                connect, read = self._timeout(state)
+                hosts.append({
+                    'host': host,
+                    'samples': len(state.samples),
+                    'ewma_ms': round(state.ewma * 1000, 2) if state.ewma is not None else None,
+                    'p95_ms': round(state.p95() * 1000, 2) if state.samples else None,
+                    'connect_timeout': round(connect, 2),
+                    'read_timeout': round(read, 2),
+                    'timeouts': state.timeouts
+                })
+        hosts.sort(key=lambda item: item['read_timeout'], reverse=True)
+        return {
+            'hosts': len(hosts),
+            'timeouts': sum(item['timeouts'] for item in hosts),
+            'min_timeout': self.min_timeout,
+            'max_timeout': self.max_timeout,
+            'slowest_hosts': hosts[:STATS_TOP_HOSTS]
+        }
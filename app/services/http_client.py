@@ -0,0 +1,70 @@
+"""
+HTTP 客户端 - 爬虫全局共享的连接池会话
+"""
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 默认连接池参数：pool_connections 为缓存的主机连接池数量，pool_maxsize 为每个主机的最大保持连接数
+DEFAULT_POOL_CONNECTIONS = 100
+DEFAULT_POOL_MAXSIZE = 10
+
+_session = None
+_pool_maxsize = 0
+_lock = threading.Lock()
+
+
+def _mount_adapters(session, pool_maxsize):
+    """为 http/https 挂载指定大小的连接池适配器（关闭被替换的旧适配器）"""
+    old_adapter = session.adapters.get('https://')
+    adapter = HTTPAdapter(
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize,
+        pool_block=False
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if old_adapter is not None:
+        # 释放旧连接池的空闲连接（正在使用的连接归还时关闭）
+        old_adapter.close()
+
+
+def get_session(pool_maxsize=None):
+    """
+    获取全局共享的 requests.Session（keep-alive 复用 TCP/TLS 连接）
+
+    会话只共享连接池，不保存 Cookie：各次爬取、各网站之间互不影响，
+    与每次请求使用独立会话的行为一致（同一请求的重定向过程中仍会携带 Cookie）。
+
+    参数:
+        pool_maxsize: int - 每个主机的连接池大小，通常取爬取线程数；
+                      只会扩大不会缩小，已有会话按需重新挂载适配器
+
+    返回:
+        requests.Session
+    """
+    global _session, _pool_maxsize
+
+    wanted = max(DEFAULT_POOL_MAXSIZE, int(pool_maxsize or 0))
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            _mount_adapters(_session, wanted)
+            _pool_maxsize = wanted
+        elif wanted > _pool_maxsize:
+            _mount_adapters(_session, wanted)
+            _pool_maxsize = wanted
+        return _session
+
+
+def close_session():
+    """关闭全局会话并释放连接池"""
+    global _session, _pool_maxsize
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _pool_maxsize = 0
@@ -0,0 +1,112 @@
+"""
+链接提取 - 单次遍历文档提取页面中的资源与导航链接
+"""
+from urllib.parse import urljoin
+
+from lxml import etree
+
+# 需要检查的 HTML 元素及其属性
+ELEMENTS_TO_CHECK = {
+    'a': ['href'],
+    'img': ['src', 'srcset', 'data-src', 'data-srcset'],
+    'script': ['src'],
+    'link': ['href'],
+    'video': ['src', 'poster', 'data-src'],
+    'audio': ['src', 'data-src'],
+    'iframe': ['src', 'data-src'],
+    'source': ['src', 'srcset', 'data-src'],
+    'embed': ['src', 'data-src'],
+    'track': ['src'],
+    'object': ['data']
+}
+
+# 值为 "url 描述符, url 描述符" 形式的属性
+SRCSET_ATTRIBUTES = ('srcset', 'data-srcset')
+
+
+def _join(base_url, value):
+    """拼接为绝对地址，无法解析的地址（如 http://[bad/）返回 None"""
+    try:
+        return urljoin(base_url, value)
+    except ValueError:
+        return None
+
+
+def _add_attribute_links(tag, attr, value, base_url, results):
+    """解析单个属性值并加入 (tag, attr, url) 结果集合（跳过无法解析的地址，不影响同页其他链接）"""
+    value = value.strip()
+    if not value:
+        return
+
+    if attr in SRCSET_ATTRIBUTES:
+        values = [p.strip().split()[0] for p in value.split(',') if p.strip()]
+    else:
+        values = [value]
+    for item in values:
+        absolute_url = _join(base_url, item)
+        if absolute_url is not None:
+            results.add((tag, attr, absolute_url))
+
+
+def extract_links(soup, base_url):
+    """
+    从 BeautifulSoup 文档中提取链接（单次遍历）
+
+    参数:
+        soup: BeautifulSoup - 已解析的文档
+        base_url: str - 用于拼接相对地址的基准 url
+
+    返回:
+        set[tuple] - {(tag, attr, absolute_url), ...}
+    """
+    results = set()
+    for element in soup.find_all(list(ELEMENTS_TO_CHECK)):
+        for attr in ELEMENTS_TO_CHECK[element.name]:
+            if element.has_attr(attr):
+                _add_attribute_links(element.name, attr, element[attr], base_url, results)
+    return results
+
+
+class _LinkTarget:
+    """lxml 解析器事件回调：只处理起始标签，不构建文档树"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.results = set()
+
+    def start(self, tag, attrib):
+        attributes = ELEMENTS_TO_CHECK.get(tag)
+        if not attributes:
+            return
+        for attr in attributes:
+            value = attrib.get(attr)
+            if value is not None:
+                _add_attribute_links(tag, attr, value, self.base_url, self.results)
+
+    def end(self, tag):
+        pass
+
+    def data(self, data):
+        pass
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return self.results
+
+
+def extract_links_from_html(text, base_url):
+    """
+    以 lxml 事件解析方式从 HTML 文本中提取链接（不构建 BeautifulSoup 树）
+
+    参数:
+        text: str - 已解码的 HTML 文本
+        base_url: str - 用于拼接相对地址的基准 url
+
+    返回:
+        set[tuple] - {(tag, attr, absolute_url), ...}，与 extract_links 结果一致
+    """
+    parser = etree.HTMLParser(target=_LinkTarget(base_url))
+    parser.feed(text)
+    return parser.close()
@@ -0,0 +1,71 @@
+"""
+链接优先级 - 发现链接时计算重要性得分并缓存，用于优先抓取高分页面
+"""
+import threading
+
+from app.services.link_scoring import BatchLinkScorer
+
+
+class LinkScoreCache:
+    """
+    线程安全的链接得分缓存（生命周期为一次爬取）
+
+    每个 url 只在首次被发现时计算一次得分，遍历排序、预算接纳与结果记录都复用该得分；
+    一批新发现的链接由 BatchLinkScorer 批量评分，结果与 CriticalLinkDetector 逐个计算一致。
+    """
+
+    def __init__(self, detector, base_domain=None, original_domain=None):
+        """
+        参数:
+            detector: CriticalLinkDetector - 链接重要性检测器
+            base_domain: str - 入口页面域名
+            original_domain: str - 网站配置的域名（用于判断同源）
+        """
+        self.detector = detector
+        self.base_domain = base_domain
+        self.original_domain = original_domain
+        self.hits = 0
+        self._scores = {}
+        self._scorer = None
+        self._lock = threading.Lock()
+
+    def score(self, url):
+        """返回 url 的重要性得分（0-1），未计算过时计算并缓存"""
+        with self._lock:
+            cached = self._scores.get(url)
+            if cached is not None:
+                self.hits += 1
+                return cached
+        value = self.detector.calculate_link_importance(
+            url, base_domain=self.base_domain, original_domain=self.original_domain
+        )
+        with self._lock:
+            self._scores.setdefault(url, value)
+        return value
+
+    def score_many(self, links):
+        """批量计算尚未缓存的得分"""
+        with self._lock:
+            missing = [url for url in dict.fromkeys(links) if url not in self._scores]
+            if self._scorer is None and missing:
+                self._scorer = BatchLinkScorer(self.detector.analyzer, self.original_domain)
+            scorer = self._scorer
+        if not missing:
+            return
+        values = scorer.scores(missing).tolist()
+        with self._lock:
+            for url, value in zip(missing, values):
+                self._scores.setdefault(url, value)
+
+    def rank(self, links):
+        """按得分从高到低排序（得分相同时保持原有顺序）"""
+        links = list(links)
+        self.score_many(links)
+        # 直接读取已缓存的得分，不计入 score() 的缓存命中次数
+        with self._lock:
+            return sorted(links, key=self._scores.__getitem__, reverse=True)
+
+    def stats(self):
+        """已评分的 url 数与缓存命中次数"""
+        with self._lock:
+            return {'scored': len(self._scores), 'hits': self.hits}
@@ -0,0 +1,222 @@
+"""
+批量链接评分 - 一次遍历计算一批 url 的特征与重要性得分（结果与 CriticalLinkDetector 逐个计算一致）
+"""
+import re
+from urllib.parse import unquote, urlparse
+
+import numpy as np
+
+# 与 CriticalLinkDetector 一致的规则
+DOMAIN_PATTERN = re.compile(r'(?:www\.)?([a-zA-Z0-9-]+)\.(?:com|cn|net|org|edu|gov|co\.[a-z]+|[a-z]{2,})')
+SEPARATOR_PATTERN = re.compile(r'[-_/]+')
+STATIC_PATTERN = re.compile(r'\.(js|css|png|jpe?g|gif|svg|ico|pdf|zip)$', re.I)
+AD_MARKERS = ['ad=', 'ads=', '/ad/', '/ads/', 'banner', 'promo']
+DECORATION_MARKERS = ['icon', 'sprite', 'small']
+
+# 特征名称（features 返回的数组）
+FEATURE_NAMES = ('text', 'position', 'visual', 'same_origin')
+
+# 常见的纯 ASCII http(s) url 直接截取路径，其余情况交给 urlparse
+SIMPLE_URL_PATTERN = re.compile(r'https?://[!$-.0->@-Z^-z|~]*(?=[/?#]|$)([^?#]*)')
+SIMPLE_URL_CHARS = re.compile(r'[!#-Z^-z|~]*')
+
+
+def url_path(url):
+    """
+    返回 urlparse(url).path（对常见 url 跳过完整解析）
+
+    只处理 scheme 为 http/https、无空白与控制字符、主机部分不含 IPv6 方括号的纯 ASCII url，
+    结果与 urlparse 相同（包括去掉最后一段中 ; 之后的参数）。
+    """
+    match = SIMPLE_URL_PATTERN.match(url) if SIMPLE_URL_CHARS.fullmatch(url) else None
+    if match is None:
+        return urlparse(url).path
+    path = match.group(1)
+    if ';' in path:
+        # 与 urllib.parse._splitparams 一致
+        index = path.find(';', path.rfind('/')) if '/' in path else path.find(';')
+        if index >= 0:
+            path = path[:index]
+    return path
+
+
+def _trie_pattern(words):
+    """将关键词构造成前缀树形式的正则（同一位置优先匹配最长的关键词）"""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+class KeywordAutomaton:
+    """
+    多关键词匹配自动机
+
+    所有关键词编译为一个前缀树正则，以零宽断言在每个位置取最长匹配，
+    再补上该匹配的全部前缀关键词，即得到文本中出现的全部关键词（与逐个 `kw in text` 等价）。
+    """
+
+    def __init__(self, groups):
+        """
+        参数:
+            groups: list[list[str]] - 关键词分组，count 按组返回命中的关键词数
+        """
+        self.groups = [[kw.lower() for kw in group] for group in groups]
+        words = sorted({kw for group in self.groups for kw in group})
+        self._pattern = re.compile('(?=(' + _trie_pattern(words) + '))') if words else None
+        # 匹配到的关键词 -> 各组中被其覆盖（为其前缀）的关键词
+        self._closure = {
+            word: [frozenset(kw for kw in group if word.startswith(kw)) for group in self.groups]
+            for word in words
+        }
+
+    def count(self, text):
+        """
+        返回各组在 text 中出现的不同关键词数
+
+        返回:
+            list[int] - 与 groups 顺序一致
+        """
+        if self._pattern is None:
+            return [0] * len(self.groups)
+        hits = [set() for _ in self.groups]
+        for word in set(self._pattern.findall(text)):
+            for index, covered in enumerate(self._closure[word]):
+                hits[index] |= covered
+        return [len(group_hits) for group_hits in hits]
+
+
+def _repeated_sum(step, count):
+    """逐次累加 step 的结果表，与逐个关键词累加得分的浮点结果一致"""
+    table = [0.0]
+    for _ in range(count):
+        table.append(table[-1] + step)
+    return np.array(table)
+
+
+class BatchLinkScorer:
+    """
+    批量链接评分器（每次爬取按网站域名构造一次）
+
+    同源域名模式、关键词自动机与标记匹配规则在构造时预编译；
+    每个 url 只解析一次，分项得分与总分以 NumPy 数组返回，
+    数值与 CriticalLinkDetector.calculate_link_importance 逐个计算的结果完全一致。
+    """
+
+    def __init__(self, analyzer, original_domain):
+        """
+        参数:
+            analyzer: LinkAnalyzer - 关键词配置
+            original_domain: str - 网站配置的域名（用于判断同源）
+        """
+        domain = re.sub(r'^https?://', '', original_domain)
+        domain = re.sub(r'/.*$', '', domain)
+        self.domain_token = DOMAIN_PATTERN.search(domain).group(1)
+
+        important = [kw.lower() for kw in analyzer.important_keywords]
+        ads = [kw.lower() for kw in analyzer.ad_keywords]
+        self.keywords = KeywordAutomaton([important, ads])
+        self._bonus = _repeated_sum(0.2, len(important))
+        self._penalty = _repeated_sum(0.3, len(ads))
+        self._ad_markers = re.compile('|'.join(map(re.escape, AD_MARKERS)))
+        self._decoration_markers = re.compile('|'.join(map(re.escape, DECORATION_MARKERS)))
+
+    def _scan(self, urls):
+        """逐个 url 提取原始特征（解析一次），返回各特征的数组"""
+        size = len(urls)
+        text_length = np.zeros(size)
+        important = np.zeros(size, dtype=np.int64)
+        ads = np.zeros(size, dtype=np.int64)
+        depth = np.zeros(size, dtype=np.int64)
+        static = np.zeros(size, dtype=bool)
+        parse_failed = np.zeros(size, dtype=bool)
+        ad_marker = np.zeros(size, dtype=bool)
+        decoration = np.zeros(size, dtype=bool)
+        same_origin = np.zeros(size, dtype=bool)
+
+        for index, url in enumerate(urls):
+            url_lower = (url or '').lower()
+            try:
+                path = url_path(url_lower) or ''
+                text = SEPARATOR_PATTERN.sub(' ', unquote(path.strip('/').lower()))
+                depth[index] = len([seg for seg in path.split('/') if seg])
+                static[index] = STATIC_PATTERN.search(path) is not None
+            except Exception:
+                text = url_lower
+                parse_failed[index] = True
+
+            text_length[index] = len(text)
+            important[index], ads[index] = self.keywords.count(text)
+            ad_marker[index] = self._ad_markers.search(url_lower) is not None
+            decoration[index] = self._decoration_markers.search(url_lower) is not None
+            same_origin[index] = self.domain_token in url
+
+        return text_length, important, ads, depth, static, parse_failed, ad_marker, decoration, same_origin
+
+    def features(self, urls):
+        """
+        计算分项特征得分
+
+        参数:
+            urls: list[str]
+
+        返回:
+            dict[str, np.ndarray] - text/position/visual 为 0-1 的分项得分，same_origin 为布尔数组
+        """
+        (text_length, important, ads, depth, static, parse_failed,
+         ad_marker, decoration, same_origin) = self._scan(urls)
+
+        # 文本得分：0.4 + 长度分 + 重要关键词加分 - 广告关键词扣分
+        base = 0.4 + np.minimum(text_length / 20.0, 0.3)
+        base = base + self._bonus[important]
+        base = base - self._penalty[ads]
+        text = np.maximum(0.0, np.minimum(base, 1.0))
+
+        # 位置得分：按路径深度，静态资源扣分
+        position = np.where(depth == 0, 0.8, np.where(depth <= 2, 0.6, 0.35))
+        position = np.where(static, position - 0.3, position)
+        position = np.maximum(0.0, np.minimum(position, 1.0))
+        position = np.where(parse_failed, 0.5, position)
+
+        # 装饰性特征
+        visual = np.full(len(urls), 0.5)
+        visual = np.where(ad_marker, visual - 0.2, visual)
+        visual = np.where(decoration, visual - 0.1, visual)
+        visual = np.maximum(0.0, np.minimum(visual, 1.0))
+
+        return {
+            'text': text,
+            'position': position,
+            'visual': visual,
+            'same_origin': same_origin
+        }
+
+    def scores(self, urls, features=None):
+        """
+        计算重要性得分（0-1）
+
+        参数:
+            urls: list[str]
+            features: dict - 可选，已由 features(urls) 计算的特征
+
+        返回:
+            np.ndarray - 与 urls 顺序一致的得分
+        """
+        if features is None:
+            features = self.features(urls)
+        score = features['text'] * 0.6
+        score = score + features['position'] * 0.2
+        score = score + features['visual'] * 0.2
+        score = np.where(features['same_origin'], score + 0.4, score - 0.3)
+        return np.minimum(np.maximum(score, 0.0), 1.0)
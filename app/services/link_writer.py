@@ -0,0 +1,73 @@
+"""
+链接写入 - 批量 upsert 爬取结果，减少逐条读写数据库的往返
+"""
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.models import CrawledLinkModel
+
+# 每批写入的链接数
+DEFAULT_BATCH_SIZE = 500
+
+# 唯一索引冲突的错误码（并发 upsert 同一链接时出现）
+DUPLICATE_KEY_ERROR = 11000
+
+
+class CrawledLinkWriter:
+    """
+    爬取链接批量写入器
+
+    add 收集 CrawledLinkModel.create 生成的文档，每满 batch_size 条以无序 bulk_write 写入一次；
+    新插入的链接数（upserted）即本次爬取的新增链接数。
+    """
+
+    def __init__(self, db, batch_size=DEFAULT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = max(1, int(batch_size))
+        self.upserted = 0
+        self.updated = 0
+        self.batches = 0
+        self._operations = []
+
+    def add(self, link_doc):
+        """加入一条链接，达到批量大小时写入"""
+        filter_doc, update = CrawledLinkModel.upsert(link_doc)
+        self._operations.append(UpdateOne(filter_doc, update, upsert=True))
+        if len(self._operations) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """写入尚未提交的链接"""
+        operations, self._operations = self._operations, []
+        if operations:
+            self._write(operations)
+
+    def _write(self, operations, retry=True):
+        """
+        以无序 bulk_write 写入一批操作
+
+        唯一索引冲突时只重试冲突的操作一次（retry=False 的递归调用），
+        重试的结果计入 upserted/updated，但不另计一个批次。
+        """
+        try:
+            result = self.db.crawled_links.bulk_write(operations, ordered=False)
+            counts = result.bulk_api_result
+        except BulkWriteError as e:
+            counts = e.details
+            errors = counts.get('writeErrors', [])
+            if any(error.get('code') != DUPLICATE_KEY_ERROR for error in errors):
+                raise
+            # 其他进程同时插入了相同链接：重试一次，此时按已存在链接更新
+            if retry:
+                self._write([operations[error['index']] for error in errors], retry=False)
+            else:
+                raise
+        # 重试只是同一批的补写，计数只在外层调用中累加一次
+        if retry:
+            self.batches += 1
+        self.upserted += counts.get('nUpserted', 0)
+        self.updated += counts.get('nMatched', 0)
+
+    def stats(self):
+        """写入统计"""
+        return {'upserted': self.upserted, 'updated': self.updated, 'batches': self.batches}
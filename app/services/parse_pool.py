@@ -0,0 +1,105 @@
+"""
+解析进程池 - 在独立进程中解析页面并提取链接，避免 CPU 密集的解析占用 GIL
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+# 单个页面在进程池中解析（含排队）的最长等待秒数
+PARSE_TIMEOUT = 30
+
+
+def parse_links_job(content, content_type, base_url, url_rules=None):
+    """
+    子进程中执行的解析任务
+
+    只接收响应体字节与响应头信息，只返回 url 字符串列表，
+    解析得到的文档对象不跨进程传递。
+    """
+    from app.services.crawler_service import extract_page_links
+    return extract_page_links(content, content_type, base_url, url_rules)
+
+
+class ParsePool:
+    """
+    页面解析进程池（生命周期为一次爬取）
+
+    抓取线程调用 parse 提交响应体并等待链接列表；子进程以 spawn 方式启动，
+    不继承父进程中的线程与连接。进程池异常退出时改为在当前线程内解析。
+    等待超过 timeout 秒时：任务仍在排队则取消并在当前线程内解析，
+    已在子进程中执行（页面本身解析过慢）则跳过该页面。
+    """
+
+    def __init__(self, workers, timeout=PARSE_TIMEOUT):
+        self.workers = max(1, int(workers))
+        self.timeout = timeout
+        self.pages = 0
+        self.bytes = 0
+        self.fallbacks = 0
+        self.timeouts = 0
+        self._wait = 0.0
+        self._broken = False
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+    def parse(self, content, content_type, base_url, url_rules=None):
+        """
+        解析页面并返回规范化后的有效链接
+
+        返回:
+            list[str] | None - 有效链接；无法解析返回 None
+        """
+        started = time.monotonic()
+        links, pooled, timed_out = None, False, False
+        if not self._broken:
+            try:
+                future = self._executor.submit(parse_links_job, content, content_type, base_url, url_rules)
+                links, pooled = future.result(timeout=self.timeout), True
+            except FutureTimeout:
+                timed_out = True
+                # cancel 成功说明仍在排队（进程池繁忙或卡住），改为线程内解析；否则跳过该页面
+                pooled = not future.cancel()
+                print(f"解析超过 {self.timeout} 秒{'，已跳过' if pooled else '，改为线程内解析'}: {base_url}")
+            except (BrokenProcessPool, RuntimeError) as e:
+                # 子进程异常退出或进程池已关闭
+                if not self._broken:
+                    print(f"解析进程池不可用，改为线程内解析: {e}")
+                self._broken = True
+        if not pooled:
+            links = parse_links_job(content, content_type, base_url, url_rules)
+
+        with self._lock:
+            self.pages += 1
+            self.bytes += len(content)
+            self._wait += time.monotonic() - started
+            if not pooled:
+                self.fallbacks += 1
+            if timed_out:
+                self.timeouts += 1
+        return links
+
+    def shutdown(self):
+        """关闭进程池（不等待排队中的任务；有解析超时时结束仍在运行的子进程）"""
+        processes = list((getattr(self._executor, '_processes', None) or {}).values())
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.timeouts:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+    def stats(self):
+        """解析页面数、字节数、平均等待耗时、回退次数与超时次数"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'pages': self.pages,
+                'bytes': self.bytes,
+                'avg_ms': round(self._wait / self.pages * 1000, 2) if self.pages else 0.0,
+                'fallbacks': self.fallbacks,
+                'timeouts': self.timeouts
+            }
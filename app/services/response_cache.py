@@ -0,0 +1,132 @@
+"""
+响应元数据缓存 - 单次爬取内复用已抓取 URL 的响应信息
+"""
+import threading
+
+
+class ResponseCache:
+    """
+    线程安全的响应元数据缓存（生命周期为一次爬取）
+
+    URL 首次被抓取时记录状态码、最终 URL、内容类型、大小、耗时、
+    验证头（ETag/Last-Modified）与页面出链，后续处理（如 process_link）直接复用，避免重复请求。
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def build_entry(response, content_length=None):
+        """
+        由 requests 响应构造元数据字典
+
+        参数:
+            response: requests.Response | None - 请求失败时为 None
+            content_length: int - 实际读取的字节数，缺省时取 Content-Length 头
+
+        返回:
+            dict - 响应元数据
+        """
+        if response is None:
+            return {
+                'ok': False,
+                'status_code': None,
+                'final_url': None,
+                'content_type': '',
+                'content_length': None,
+                'elapsed': None,
+                'etag': None,
+                'last_modified': None,
+                'out_links': None,
+                'not_modified': False
+            }
+
+        if content_length is None:
+            try:
+                content_length = int(response.headers.get('Content-Length'))
+            except (TypeError, ValueError):
+                content_length = None
+
+        return {
+            'ok': True,
+            'status_code': response.status_code,
+            'final_url': response.url,
+            'content_type': response.headers.get('Content-Type', ''),
+            'content_length': content_length,
+            'elapsed': response.elapsed.total_seconds() if response.elapsed else None,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'out_links': None,
+            'not_modified': False
+        }
+
+    def record(self, url, response, content_length=None, out_links=None):
+        """记录 url 的响应元数据并返回该记录（out_links 为页面解析出的链接）"""
+        entry = self.build_entry(response, content_length)
+        entry['out_links'] = out_links
+        with self._lock:
+            self._entries[url] = entry
+        return entry
+
+    def record_not_modified(self, url, response, stored):
+        """
+        记录 304 响应：状态码、内容类型、大小与出链沿用上次保存的值
+
+        参数:
+            stored: dict - ValidatorStore.lookup 返回的验证信息
+        """
+        entry = self.build_entry(response)
+        entry.update({
+            'status_code': stored.get('status_code') or entry['status_code'],
+            'content_type': stored.get('content_type') or entry['content_type'],
+            'content_length': stored.get('content_length'),
+            'etag': entry['etag'] or stored.get('etag'),
+            'last_modified': entry['last_modified'] or stored.get('last_modified'),
+            'out_links': stored.get('out_links'),
+            'not_modified': True
+        })
+        with self._lock:
+            self._entries[url] = entry
+        return entry
+
+    def get(self, url):
+        """获取 url 的响应元数据，不存在返回 None"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def __contains__(self, url):
+        with self._lock:
+            return url in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def latency_summary(self):
+        """
+        汇总本次爬取的请求耗时（基于响应头返回耗时，可反映连接复用效果）
+
+        返回:
+            dict - {'count', 'avg_ms', 'p95_ms', 'max_ms'}
+        """
+        with self._lock:
+            elapsed = sorted(e['elapsed'] for e in self._entries.values() if e.get('elapsed') is not None)
+
+        if not elapsed:
+            return {'count': 0, 'avg_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+
+        p95 = elapsed[min(len(elapsed) - 1, int(len(elapsed) * 0.95))]
+        return {
+            'count': len(elapsed),
+            'avg_ms': round(sum(elapsed) / len(elapsed) * 1000, 2),
+            'p95_ms': round(p95 * 1000, 2),
+            'max_ms': round(elapsed[-1] * 1000, 2)
+        }
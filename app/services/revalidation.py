@@ -0,0 +1,75 @@
+"""
+条件请求 - 基于上次抓取保存的 ETag/Last-Modified 重新验证页面
+"""
+import threading
+
+
+class ValidatorStore:
+    """
+    网站页面的验证信息（来自 crawled_links）
+
+    页面上次抓取时保存了 ETag/Last-Modified 与出链列表（out_links），
+    再次抓取时带上 If-None-Match/If-Modified-Since；服务器返回 304
+    即表示页面未变化，直接复用保存的出链而不再下载与解析。
+    """
+
+    def __init__(self, db, website_id):
+        self.db = db
+        self.website_id = website_id
+        self._lock = threading.Lock()
+        self.conditional_requests = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+    def lookup(self, url):
+        """
+        查询 url 的验证信息
+
+        返回:
+            dict | None - 仅当保存了验证头与出链时返回
+        """
+        doc = self.db.crawled_links.find_one(
+            {'website_id': self.website_id, 'url': url},
+            {'_id': 0, 'etag': 1, 'last_modified': 1, 'content_length': 1,
+             'out_links': 1, 'status_code': 1, 'content_type': 1}
+        )
+        if not doc or doc.get('out_links') is None:
+            return None
+        if not doc.get('etag') and not doc.get('last_modified'):
+            return None
+        return doc
+
+    def conditional_headers(self, url, headers):
+        """
+        生成带条件请求头的请求头
+
+        返回:
+            tuple: (headers, stored) - 无验证信息时 stored 为 None，headers 原样返回
+        """
+        stored = self.lookup(url)
+        if stored is None:
+            return headers, None
+
+        headers = dict(headers)
+        if stored.get('etag'):
+            headers['If-None-Match'] = stored['etag']
+        if stored.get('last_modified'):
+            headers['If-Modified-Since'] = stored['last_modified']
+        with self._lock:
+            self.conditional_requests += 1
+        return headers, stored
+
+    def mark_not_modified(self, stored):
+        """记录一次 304 命中"""
+        with self._lock:
+            self.not_modified += 1
+            self.bytes_saved += stored.get('content_length') or 0
+
+    def stats(self):
+        """条件请求次数、304 次数与节省的字节数"""
+        with self._lock:
+            return {
+                'conditional_requests': self.conditional_requests,
+                'not_modified': self.not_modified,
+                'bytes_saved': self.bytes_saved
+            }
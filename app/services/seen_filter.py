@@ -0,0 +1,179 @@
+"""
+已爬取 URL 过滤器 - 增量模式下基于布隆过滤器的紧凑去重集合
+"""
+import hashlib
+import math
+import threading
+
+from bson import Binary
+
+from app.models import SeenFilterModel
+
+# 布隆过滤器默认容量下限与误判率
+DEFAULT_CAPACITY = 10000
+DEFAULT_ERROR_RATE = 0.001
+
+
+class BloomFilter:
+    """布隆过滤器（位数组 + 双重哈希）"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE,
+                 num_bits=None, num_hashes=None, bits=None, count=0):
+        """
+        参数:
+            capacity: int - 预期元素数量
+            error_rate: float - 预期误判率
+            num_bits/num_hashes/bits/count: 从持久化数据恢复时使用
+        """
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        if num_bits is None:
+            num_bits = int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        if num_hashes is None:
+            num_hashes = max(1, int(round(num_bits / self.capacity * math.log(2))))
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray(bits) if bits is not None else bytearray((num_bits + 7) // 8)
+        self.count = count
+        self._lock = threading.Lock()
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        """加入元素，返回该元素此前是否可能已存在"""
+        positions = self._positions(item)
+        with self._lock:
+            existed = True
+            for pos in positions:
+                mask = 1 << (pos & 7)
+                if not self.bits[pos >> 3] & mask:
+                    existed = False
+                    self.bits[pos >> 3] |= mask
+            if not existed:
+                self.count += 1
+        return existed
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def saturated(self):
+        """元素数量是否已超过设计容量（误判率将明显上升）"""
+        return self.count > self.capacity
+
+
+class SeenUrlSet:
+    """
+    网站已爬取 URL 集合（可直接作为 exclude 传入 crawler_link）
+
+    先查布隆过滤器，未命中即确定不存在；命中时再到 crawled_links 做一次
+    精确查询，并缓存查询结果。
+    """
+
+    def __init__(self, db, website_id, bloom):
+        self.db = db
+        self.website_id = website_id
+        self.bloom = bloom
+        self._confirmed = {}
+        self._lock = threading.Lock()
+        self.exact_checks = 0
+        self.false_positives = 0
+
+    def __contains__(self, url):
+        if url not in self.bloom:
+            return False
+
+        with self._lock:
+            if url in self._confirmed:
+                return self._confirmed[url]
+
+        exists = self.db.crawled_links.find_one(
+            {'website_id': self.website_id, 'url': url},
+            {'_id': 1}
+        ) is not None
+
+        with self._lock:
+            self._confirmed[url] = exists
+            self.exact_checks += 1
+            if not exists:
+                self.false_positives += 1
+        return exists
+
+    def __len__(self):
+        return len(self.bloom)
+
+    def stats(self):
+        """精确查询次数与误判次数"""
+        with self._lock:
+            return {
+                'filter_size': len(self.bloom),
+                'exact_checks': self.exact_checks,
+                'false_positives': self.false_positives
+            }
+
+
+def build_seen_filter(db, website_id, error_rate=DEFAULT_ERROR_RATE):
+    """
+    由 crawled_links 全量构建网站的布隆过滤器（首次使用或容量不足时）
+
+    返回:
+        BloomFilter
+    """
+    total = db.crawled_links.count_documents({'website_id': website_id})
+    bloom = BloomFilter(capacity=max(DEFAULT_CAPACITY, total * 2), error_rate=error_rate)
+    for doc in db.crawled_links.find({'website_id': website_id}, {'url': 1, '_id': 0}):
+        bloom.add(doc['url'])
+    return bloom
+
+
+def load_seen_filter(db, website_id):
+    """
+    加载网站的布隆过滤器；不存在或已饱和时重新构建并保存
+
+    返回:
+        BloomFilter
+    """
+    doc = db.seen_filters.find_one({'website_id': website_id})
+    if doc:
+        bloom = BloomFilter(
+            capacity=doc['capacity'],
+            error_rate=doc['error_rate'],
+            num_bits=doc['num_bits'],
+            num_hashes=doc['num_hashes'],
+            bits=doc['bits'],
+            count=doc['count']
+        )
+        if not bloom.saturated:
+            return bloom
+
+    bloom = build_seen_filter(db, website_id)
+    save_seen_filter(db, website_id, bloom)
+    return bloom
+
+
+def save_seen_filter(db, website_id, bloom):
+    """持久化网站的布隆过滤器"""
+    with bloom._lock:
+        bits = Binary(bytes(bloom.bits))
+        count = bloom.count
+    db.seen_filters.update_one(
+        {'website_id': website_id},
+        SeenFilterModel.upsert(
+            website_id=website_id,
+            capacity=bloom.capacity,
+            error_rate=bloom.error_rate,
+            num_bits=bloom.num_bits,
+            num_hashes=bloom.num_hashes,
+            bits=bits,
+            count=count
+        ),
+        upsert=True
+    )
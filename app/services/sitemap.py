@@ -0,0 +1,249 @@
+"""
+站点地图 - 读取 robots.txt 声明的站点地图并流式解析，为爬取提供种子 url
+"""
+import gzip
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlparse
+
+import requests
+from lxml import etree
+
+from app.models import SitemapCacheModel
+from app.services.http_client import get_session
+
+# 站点地图缓存默认有效期（秒）
+DEFAULT_SITEMAP_TTL = 24 * 3600
+
+# 单个网站最多抓取的站点地图文件数与页面条目数（协议规定单个文件最多 50000 条）
+MAX_SITEMAP_FILES = 50
+MAX_SITEMAP_URLS = 50000
+
+# 协议规定的 url 最大长度，超过的条目跳过
+MAX_LOC_LENGTH = 2048
+
+# 缓存时每个条目块文档保存的条目数（单块不超过数 MB）
+CACHE_CHUNK_SIZE = 1000
+
+SITEMAP_TIMEOUT = 10
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def parse_lastmod(value):
+    """解析 W3C 日期时间格式的 lastmod，统一为 UTC naive datetime；无法解析返回 None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def sitemaps_from_robots(text, base_url):
+    """从 robots.txt 文本中提取 Sitemap 声明"""
+    sitemaps = []
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line.lower().startswith('sitemap:'):
+            location = line.split(':', 1)[1].strip()
+            if location:
+                sitemaps.append(urljoin(base_url, location))
+    return sitemaps
+
+
+def discover_sitemaps(url, headers):
+    """
+    读取网站 robots.txt 中声明的站点地图，未声明时使用 /sitemap.xml
+
+    返回:
+        list[str] - 站点地图地址
+    """
+    parsed = urlparse(url)
+    root = f'{parsed.scheme}://{parsed.netloc}/'
+    robots_url = urljoin(root, 'robots.txt')
+    try:
+        response = get_session().get(robots_url, headers=headers, timeout=SITEMAP_TIMEOUT)
+        if response.status_code == 200:
+            sitemaps = sitemaps_from_robots(response.text, root)
+            if sitemaps:
+                return sitemaps
+    except requests.exceptions.RequestException as e:
+        print(f"robots.txt 读取失败: {robots_url} - {str(e)}")
+    return [urljoin(root, 'sitemap.xml')]
+
+
+class _PrefixedStream:
+    """在底层流前拼接已读取的前缀字节（用于探测文件头后继续流式读取）"""
+
+    def __init__(self, prefix, raw):
+        self._prefix = prefix
+        self._raw = raw
+
+    def read(self, size=-1):
+        if not self._prefix:
+            return self._raw.read(size)
+        if size is None or size < 0:
+            data, self._prefix = self._prefix + self._raw.read(), b''
+            return data
+        data, self._prefix = self._prefix[:size], self._prefix[size:]
+        if len(data) < size:
+            data += self._raw.read(size - len(data))
+        return data
+
+
+def open_sitemap_stream(response):
+    """将响应体包装为可流式读取的文件对象（自动识别 gzip 压缩的站点地图）"""
+    # 处理 Content-Encoding 压缩
+    response.raw.decode_content = True
+    prefix = response.raw.read(2)
+    stream = _PrefixedStream(prefix, response.raw)
+    if prefix == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def iter_sitemap(stream):
+    """
+    流式解析站点地图，逐条产出条目（不构建完整文档树）
+
+    产出:
+        tuple: (kind, loc, lastmod) - kind 为 url（页面）或 sitemap（子站点地图）
+    """
+    context = etree.iterparse(
+        stream, events=('end',), tag=('{*}url', '{*}sitemap'),
+        resolve_entities=False, no_network=True, huge_tree=True, recover=True
+    )
+    for _, element in context:
+        kind = etree.QName(element).localname
+        loc = element.findtext('{*}loc')
+        lastmod = element.findtext('{*}lastmod')
+        if loc and loc.strip():
+            yield kind, loc.strip(), parse_lastmod(lastmod)
+
+        # 释放已处理的节点
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+def fetch_sitemap_entries(sitemap_urls, headers, max_files=MAX_SITEMAP_FILES, max_urls=MAX_SITEMAP_URLS):
+    """
+    抓取站点地图（支持站点地图索引与 gzip），汇总页面条目
+
+    返回:
+        tuple: (entries, fetched) - entries 为 [{'loc', 'lastmod'}, ...]，fetched 为已抓取的站点地图地址
+    """
+    pending = list(sitemap_urls)
+    fetched = []
+    seen = set()
+    entries = {}
+    session = get_session()
+
+    while pending and len(fetched) < max_files and len(entries) < max_urls:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+
+        try:
+            response = session.get(sitemap_url, headers=headers, timeout=SITEMAP_TIMEOUT, stream=True)
+        except requests.exceptions.RequestException as e:
+            print(f"站点地图请求失败: {sitemap_url} - {str(e)}")
+            continue
+
+        try:
+            if response.status_code != 200:
+                print(f"站点地图不可用 [{response.status_code}]: {sitemap_url}")
+                continue
+            fetched.append(sitemap_url)
+            for kind, loc, lastmod in iter_sitemap(open_sitemap_stream(response)):
+                if kind == 'sitemap':
+                    pending.append(urljoin(sitemap_url, loc))
+                    continue
+                loc = urljoin(sitemap_url, loc)
+                if len(loc) > MAX_LOC_LENGTH:
+                    continue
+                previous = entries.get(loc)
+                if previous is None or (lastmod and (previous['lastmod'] is None or lastmod > previous['lastmod'])):
+                    entries[loc] = {'loc': loc, 'lastmod': lastmod}
+                if len(entries) >= max_urls:
+                    break
+        except (etree.LxmlError, OSError, EOFError, requests.exceptions.RequestException) as e:
+            print(f"站点地图解析失败: {sitemap_url} - {str(e)}")
+        finally:
+            response.close()
+
+    return list(entries.values()), fetched
+
+
+def _read_cached_entries(db, doc):
+    """按块读取缓存的页面条目"""
+    entries = []
+    chunks = db.sitemap_entries.find(
+        {'website_id': doc['website_id'], 'fetched_at': doc['fetched_at']}
+    ).sort('index', 1)
+    for chunk in chunks:
+        entries.extend(chunk.get('entries', []))
+    return entries
+
+
+def _write_cached_entries(db, website_id, fetched, entries, ttl):
+    """
+    写入缓存：先写新的条目块，再更新缓存文档，最后删除旧的条目块
+    （读取方始终按缓存文档中的 fetched_at 读取完整的一组条目块）
+    """
+    fetched_at = datetime.utcnow()
+    chunks = [
+        SitemapCacheModel.entries_chunk(website_id, fetched_at, index, entries[start:start + CACHE_CHUNK_SIZE])
+        for index, start in enumerate(range(0, len(entries), CACHE_CHUNK_SIZE))
+    ]
+    if chunks:
+        db.sitemap_entries.insert_many(chunks)
+    db.sitemap_cache.update_one(
+        {'website_id': website_id},
+        SitemapCacheModel.upsert(
+            website_id=website_id, sitemaps=fetched, fetched_at=fetched_at,
+            entry_count=len(entries), chunks=len(chunks), ttl=ttl
+        ),
+        upsert=True
+    )
+    db.sitemap_entries.delete_many({'website_id': website_id, 'fetched_at': {'$ne': fetched_at}})
+
+
+def load_sitemap_entries(db, website_id, url, headers, ttl=DEFAULT_SITEMAP_TTL):
+    """
+    获取网站的站点地图条目：缓存未过期时直接使用，否则重新抓取并写入缓存
+
+    返回:
+        tuple: (entries, from_cache)
+    """
+    doc = db.sitemap_cache.find_one({'website_id': website_id})
+    if doc and 'chunks' in doc and doc.get('expires_at') and doc['expires_at'] > datetime.utcnow():
+        return _read_cached_entries(db, doc), True
+
+    entries, fetched = fetch_sitemap_entries(discover_sitemaps(url, headers), headers)
+    _write_cached_entries(db, website_id, fetched, entries, ttl)
+    return entries, False
+
+
+def select_seeds(entries, since=None, limit=None):
+    """
+    由站点地图条目生成种子 url
+
+    按 lastmod 从新到旧排序（无 lastmod 的排在最后）；传入 since（上次爬取时间）时，
+    跳过此后未修改的条目——上次爬取已以它们为种子。
+
+    返回:
+        list[str]
+    """
+    if since is not None:
+        entries = [e for e in entries if e.get('lastmod') is None or e['lastmod'] > since]
+    entries = sorted(entries, key=lambda e: (e.get('lastmod') is not None, e.get('lastmod') or datetime.min), reverse=True)
+    seeds = [e['loc'] for e in entries]
+    return seeds[:limit] if limit else seeds
@@ -0,0 +1,151 @@
+"""
+任务队列 - 以 crawl_tasks 集合为队列，worker 认领 pending 任务并以心跳维持租约
+"""
+import threading
+import time
+
+from pymongo import ReturnDocument
+
+from app.database import get_db
+from app.models import CrawlTaskModel
+from app.services.ad_domains import ad_domains
+from app.services.checkpoint import new_lease_id
+from app.services.task_recovery import requeue_orphaned_tasks
+
+# 队列为空时的轮询间隔与遗留任务扫描间隔（秒）
+QUEUE_POLL_INTERVAL = 2
+RECOVERY_INTERVAL = 60
+
+
+def enqueue_task(db, website_id, strategy, task_type='manual', engine='recursive',
+                 depth=3, max_links=1000, concurrency=20):
+    """
+    创建爬取任务并加入队列
+
+    返回:
+        dict - 任务文档（含 _id）
+    """
+    task_doc = CrawlTaskModel.create(
+        website_id=website_id,
+        strategy=strategy,
+        task_type=task_type,
+        engine=engine,
+        params={
+            'depth': depth,
+            'max_links': max_links,
+            'concurrency': concurrency
+        }
+    )
+    result = db.crawl_tasks.insert_one(task_doc)
+    task_doc['_id'] = result.inserted_id
+    return task_doc
+
+
+def claim_next_task(db, runner_id=None):
+    """
+    按入队顺序认领一个 pending 任务（原子操作，多个 worker 不会认领到同一任务）
+
+    每次认领写入新的租约标识（runner_id），执行任务时以它作为任务与检查点的租约。
+
+    返回:
+        dict | None - 认领到的任务文档（含 runner_id）
+    """
+    return db.crawl_tasks.find_one_and_update(
+        {'status': 'pending'},
+        CrawlTaskModel.claim(runner_id or new_lease_id()),
+        sort=[('queued_at', 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def run_task(task):
+    """执行已认领的任务（存在检查点时从检查点继续）"""
+    from app.services.crawler_service import CrawlerService
+
+    params = task.get('params') or {}
+    CrawlerService().crawl(
+        task['_id'], task['website_id'], task['strategy'],
+        depth=params.get('depth', 3),
+        max_links=params.get('max_links', 1000),
+        engine=task.get('engine', 'recursive'),
+        concurrency=params.get('concurrency', 20),
+        resume=True,
+        runner_id=task['runner_id']
+    )
+
+
+class CrawlWorker:
+    """
+    队列 worker：若干线程循环认领并执行任务
+
+    可嵌入 Web 进程（后台线程），也可由 worker.py 作为独立进程运行，
+    多个进程、多台主机可同时消费同一队列。
+    """
+
+    def __init__(self, threads=1, poll_interval=QUEUE_POLL_INTERVAL):
+        self.threads = max(1, int(threads))
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._workers = []
+        self._recovery_lock = threading.Lock()
+        self._last_recovery = 0.0
+
+    def _recover(self, db):
+        """按间隔扫描遗留任务（同一进程内只由一个线程执行）"""
+        if not self._recovery_lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self._last_recovery < RECOVERY_INTERVAL:
+                return
+            self._last_recovery = time.monotonic()
+            requeued = requeue_orphaned_tasks(db)
+            if requeued:
+                print(f"已将 {len(requeued)} 个遗留任务放回队列")
+        finally:
+            self._recovery_lock.release()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                db = get_db()
+                self._recover(db)
+                task = claim_next_task(db)
+            except Exception as e:
+                print(f"任务队列读取失败: {str(e)}")
+                self._stop.wait(self.poll_interval)
+                continue
+
+            if task is None:
+                self._stop.wait(self.poll_interval)
+                continue
+
+            print(f"开始执行队列任务: {task['_id']}")
+            try:
+                run_task(task)
+            except Exception as e:
+                print(f"爬虫任务执行失败: {str(e)}")
+
+    def start(self):
+        """以后台线程启动 worker"""
+        # 启动时加载广告域名列表（优先使用磁盘上的编译缓存）
+        ad_domains.load()
+        for index in range(self.threads):
+            thread = threading.Thread(target=self._loop, name=f'crawl-worker-{index}', daemon=True)
+            thread.start()
+            self._workers.append(thread)
+        return self
+
+    def stop(self):
+        """通知 worker 停止认领新任务（执行中的任务不受影响）"""
+        self._stop.set()
+
+    def run_forever(self):
+        """启动并阻塞当前线程，直到 stop 被调用"""
+        self.start()
+        try:
+            while not self._stop.wait(1):
+                pass
+        except KeyboardInterrupt:
+            self.stop()
+        for thread in self._workers:
+            thread.join()
@@ -0,0 +1,44 @@
+"""
+任务恢复 - 识别 worker 退出后遗留的 running 任务并放回队列
+"""
+from datetime import datetime, timedelta
+
+from app.models import CrawlTaskModel
+from app.services.checkpoint import HEARTBEAT_INTERVAL
+
+# 心跳超过该时长未更新的 running 任务视为遗留任务（秒）
+ORPHAN_TIMEOUT = HEARTBEAT_INTERVAL * 6
+
+
+def requeue_orphaned_tasks(db, timeout=ORPHAN_TIMEOUT):
+    """
+    将遗留任务放回队列
+
+    遗留任务：状态为 running 且心跳超时（或从未上报心跳）。放回队列时以心跳值为条件做原子更新，
+    多个 worker 同时扫描时只有一个能成功；重新认领的 worker 从检查点继续执行。
+
+    返回:
+        list[ObjectId] - 放回队列的任务ID
+    """
+    deadline = datetime.utcnow() - timedelta(seconds=timeout)
+    candidates = db.crawl_tasks.find({
+        'status': 'running',
+        '$or': [
+            {'heartbeat_at': {'$lt': deadline}},
+            {'heartbeat_at': None}
+        ]
+    }, {'heartbeat_at': 1})
+
+    requeued = []
+    for task in candidates:
+        result = db.crawl_tasks.update_one(
+            {
+                '_id': task['_id'],
+                'status': 'running',
+                'heartbeat_at': task.get('heartbeat_at')
+            },
+            CrawlTaskModel.requeue()
+        )
+        if result.modified_count == 1:
+            requeued.append(task['_id'])
+    return requeued
@@ -0,0 +1,132 @@
+"""
+URL 规范化 - 将等价 URL 归一为同一形式，用于去重、排除判断与存储
+"""
+from urllib.parse import urlsplit, urlunsplit, unquote
+
+# 默认端口
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# 默认去除的跟踪参数（精确匹配）及前缀
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'yclid', 'dclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'spm', '_hsenc', '_hsmi'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+# 网站级规则的可选值
+TRAILING_SLASH_RULES = ['keep', 'strip', 'add']
+SCHEME_RULES = ['keep', 'https', 'http']
+
+
+def validate_url_rules(rules):
+    """
+    校验网站的 URL 规范化规则
+
+    规则字段:
+        trailing_slash: keep/strip/add - 路径末尾斜杠的处理方式
+        scheme: keep/https/http - 统一协议
+        query_whitelist: list[str] - 仅保留的查询参数（为空表示不限制）
+        strip_params: list[str] - 额外去除的查询参数
+
+    返回:
+        (是否有效, 错误消息)
+    """
+    if rules is None:
+        return True, None
+    if not isinstance(rules, dict):
+        return False, 'URL 规范化规则必须是对象'
+    if rules.get('trailing_slash', 'keep') not in TRAILING_SLASH_RULES:
+        return False, 'trailing_slash 必须是 keep、strip 或 add'
+    if rules.get('scheme', 'keep') not in SCHEME_RULES:
+        return False, 'scheme 必须是 keep、https 或 http'
+    for key in ('query_whitelist', 'strip_params'):
+        value = rules.get(key)
+        if value is not None and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+            return False, f'{key} 必须是字符串列表'
+    return True, None
+
+
+def _is_tracking_param(name, strip_params):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name in strip_params or name.startswith(TRACKING_PREFIXES)
+
+
+def _canonical_query(query, rules):
+    """去除跟踪参数、按白名单过滤并按参数名排序（保留原始编码）"""
+    if not query:
+        return ''
+
+    whitelist = rules.get('query_whitelist')
+    whitelist = {w.lower() for w in whitelist} if whitelist else None
+    strip_params = {p.lower() for p in rules.get('strip_params') or []}
+
+    kept = []
+    for segment in query.split('&'):
+        if not segment:
+            continue
+        name = unquote(segment.split('=', 1)[0].replace('+', ' '))
+        if _is_tracking_param(name, strip_params):
+            continue
+        if whitelist is not None and name.lower() not in whitelist:
+            continue
+        kept.append((name, segment))
+
+    # 稳定排序：同名参数保持原有先后顺序
+    kept.sort(key=lambda item: item[0])
+    return '&'.join(segment for _, segment in kept)
+
+
+def canonicalize_url(url, rules=None):
+    """
+    规范化 URL
+
+    - 协议与主机名小写，去除默认端口与片段（#...）
+    - 空路径补为 /，按规则处理末尾斜杠
+    - 去除跟踪参数，按白名单过滤查询参数并按参数名排序
+
+    参数:
+        url: str - 绝对地址
+        rules: dict - 网站级规则（见 validate_url_rules）
+
+    返回:
+        str - 规范化后的 URL；非 http(s) 或无法解析时原样返回
+    """
+    rules = rules or {}
+    try:
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS or not parts.hostname:
+            return url
+
+        # 先统一协议，再按最终协议去除默认端口
+        scheme_rule = rules.get('scheme', 'keep')
+        if scheme_rule != 'keep':
+            scheme = scheme_rule
+
+        host = parts.hostname.lower()
+        if ':' in host:
+            host = f'[{host}]'
+        port = parts.port
+        netloc = host if port is None or port == DEFAULT_PORTS[scheme] else f'{host}:{port}'
+
+        if parts.username or parts.password:
+            userinfo = parts.username or ''
+            if parts.password:
+                userinfo += f':{parts.password}'
+            netloc = f'{userinfo}@{netloc}'
+    except ValueError:
+        return url
+
+    path = parts.path or '/'
+    trailing_slash = rules.get('trailing_slash', 'keep')
+    if path != '/':
+        if trailing_slash == 'strip':
+            path = path.rstrip('/') or '/'
+        elif trailing_slash == 'add':
+            last_segment = path.rsplit('/', 1)[-1]
+            # 看起来是文件（含扩展名）的路径不补斜杠
+            if not path.endswith('/') and '.' not in last_segment:
+                path += '/'
+
+    query = _canonical_query(parts.query, rules)
+    return urlunsplit((scheme, netloc, path, query, ''))
@@ -124,6 +124,24 @@ def validate_schedule_type(schedule_type: str) -> tuple[bool, str]:
     return True, ""
 
 
+def parse_number(data: dict, key: str, cast, nullable: bool = False):
+    """
+    将请求中的数值字段转换为 int/float
+
+    Raises:
+        ValueError: 值不是数字（或不允许为 null 时为 null）
+    """
+    value = data[key]
+    if value is None and nullable:
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f'{key} 必须是数字')
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{key} 必须是数字')
+
+
 def parse_iso_datetime(value: str) -> datetime:
     """
     解析 ISO-8601 日期时间字符串，兼容带 Z 结尾（UTC）的情况，并统一返回“无时区”的 UTC 时间。
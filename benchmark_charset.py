@@ -0,0 +1,87 @@
+"""
+页面编码检测基准 - 比较原先对完整响应体运行 chardet 与分层编码检测器（GBK/UTF-8 页面）
+
+用法:
+    python benchmark_charset.py [--pages 20] [--kb 200]
+"""
+import argparse
+import time
+
+import chardet
+
+from app.services.charset import CharsetDetector
+
+TEXT = '新闻中心 产品与服务 关于我们 联系我们 帮助与支持 下载 登录 注册 '
+
+
+def legacy_decode(content):
+    """原先的解码方式：对完整响应体运行 chardet，置信度低时依次尝试常见编码"""
+    try:
+        detected = chardet.detect(content)
+        encoding = detected.get('encoding', 'utf-8')
+        confidence = detected.get('confidence', 0)
+        if confidence < 0.7:
+            for enc in ['utf-8', 'gbk', 'gb2312', 'gb18030', 'latin1']:
+                try:
+                    return content.decode(enc, errors='ignore')
+                except:
+                    continue
+            return content.decode('utf-8', errors='replace')
+        return content.decode(encoding or 'utf-8', errors='ignore')
+    except Exception:
+        return content.decode('utf-8', errors='replace')
+
+
+def build_page(index, size_kb, encoding, declare):
+    """生成约 size_kb KB 的测试页面，declare 为 True 时写入 <meta charset>"""
+    meta = f'<meta charset="{encoding}">' if declare else ''
+    items = []
+    length = 0
+    i = 0
+    while length < size_kb * 1024:
+        item = f'<li><a href="/page/{index}/{i}">{TEXT}{i}</a></li>\n'
+        items.append(item)
+        length += len(item.encode(encoding))
+        i += 1
+    html = f'<html><head>{meta}<title>页面 {index}</title></head><body><ul>{"".join(items)}</ul></body></html>'
+    return html.encode(encoding)
+
+
+# (名称, 编码, 是否写入 <meta charset>, Content-Type)
+SCENARIOS = [
+    ('UTF-8 无声明', 'utf-8', False, 'text/html'),
+    ('UTF-8 响应头声明', 'utf-8', False, 'text/html; charset=utf-8'),
+    ('GBK 无声明', 'gbk', False, 'text/html'),
+    ('GBK <meta> 声明', 'gbk', True, 'text/html'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='页面编码检测基准')
+    parser.add_argument('--pages', type=int, default=20, help='每种场景的页面数（同一主机）')
+    parser.add_argument('--kb', type=int, default=200, help='每个页面的大小（KB）')
+    args = parser.parse_args()
+
+    print(f"每种场景 {args.pages} 个页面, 每页约 {args.kb} KB, chardet {chardet.__version__}")
+    for name, encoding, declare, content_type in SCENARIOS:
+        pages = [build_page(i, args.kb, encoding, declare) for i in range(args.pages)]
+        expected = [page.decode(encoding) for page in pages]
+
+        started = time.perf_counter()
+        legacy = [legacy_decode(page) for page in pages]
+        legacy_elapsed = time.perf_counter() - started
+
+        detector = CharsetDetector()
+        started = time.perf_counter()
+        layered = [detector.decode(page, content_type, 'bench.local') for page in pages]
+        layered_elapsed = time.perf_counter() - started
+
+        legacy_wrong = sum(1 for text, want in zip(legacy, expected) if text != want)
+        layered_wrong = sum(1 for text, want in zip(layered, expected) if text != want)
+        print(f"{name}: 完整 chardet {legacy_elapsed * 1000 / args.pages:.1f} ms/页 (解码错误 {legacy_wrong}), "
+              f"分层检测 {layered_elapsed * 1000 / args.pages:.1f} ms/页 (解码错误 {layered_wrong}), "
+              f"加速 {legacy_elapsed / layered_elapsed:.1f} 倍")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+页面解析吞吐基准 - 比较线程内解析与不同进程数的解析进程池
+
+用法:
+    python benchmark_parse.py [--pages 400] [--links 300] [--threads 16]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.crawler_service import extract_page_links
+from app.services.parse_pool import ParsePool
+
+
+def build_page(index, links):
+    """生成包含指定数量链接的测试页面"""
+    items = []
+    for i in range(links):
+        items.append(
+            f'<li><a href="/page/{index}/{i}?utm_source=bench&id={i}">条目 {i}</a>'
+            f'<img src="/img/{i}.png" srcset="/img/{i}@2x.png 2x"></li>'
+        )
+    body = '\n'.join(items)
+    html = (
+        f'<html><head><meta charset="utf-8"><title>页面 {index}</title>'
+        f'<link rel="stylesheet" href="/static/site.css"></head>'
+        f'<body><ul>{body}</ul></body></html>'
+    )
+    return html.encode('utf-8')
+
+
+def run(pages, threads, parse):
+    """用 threads 个抓取线程并发解析全部页面，返回 (耗时, 链接总数)"""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(
+            lambda item: parse(item[1], 'text/html; charset=utf-8', f'http://bench.local/{item[0]}'),
+            enumerate(pages)
+        ))
+    return time.perf_counter() - started, sum(len(links) for links in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='页面解析吞吐基准')
+    parser.add_argument('--pages', type=int, default=400, help='测试页面数')
+    parser.add_argument('--links', type=int, default=300, help='每个页面的链接数')
+    parser.add_argument('--threads', type=int, default=16, help='抓取线程数')
+    args = parser.parse_args()
+
+    pages = [build_page(i, args.links) for i in range(args.pages)]
+    size = sum(len(page) for page in pages) / 1024 / 1024
+    print(f"页面: {args.pages}, 总大小: {size:.1f} MB, 抓取线程: {args.threads}, CPU 核数: {os.cpu_count()}")
+
+    elapsed, links = run(pages, args.threads, extract_page_links)
+    print(f"线程内解析: {elapsed:.2f}s, {args.pages / elapsed:.1f} 页/秒, {links} 个链接")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        pool = ParsePool(workers)
+        try:
+            # 预热：等待子进程启动并完成导入
+            run(pages[:workers * 2], workers, pool.parse)
+            elapsed, links = run(pages, args.threads, pool.parse)
+        finally:
+            pool.shutdown()
+        print(f"进程池 {workers} 进程: {elapsed:.2f}s, {args.pages / elapsed:.1f} 页/秒, {links} 个链接")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
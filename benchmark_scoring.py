@@ -0,0 +1,65 @@
+"""
+链接评分基准 - 比较 CriticalLinkDetector 逐个评分与 BatchLinkScorer 批量评分
+
+用法:
+    python benchmark_scoring.py [--urls 100000] [--domain example.com]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.services.crawler_service import CriticalLinkDetector
+from app.services.link_scoring import BatchLinkScorer
+
+PATH_WORDS = [
+    'news', 'about', 'product', 'ads', 'banner', 'blog', 'login', 'detail', 'list', 'item',
+    '新闻', '产品', '广告', 'download', 'promo', 'icon', 'track', 'help', '2024', 'page'
+]
+EXTENSIONS = ['', '', '', '.html', '.php', '.png', '.js', '.css', '.pdf']
+HOSTS = ['www.{domain}', 'static.{domain}', 'ads.doubleclick.net', 'cdn.other.org', 'm.{domain}']
+
+
+def build_urls(count, domain, seed=0):
+    """生成包含多种路径、查询参数与编码字符的测试 url"""
+    rng = random.Random(seed)
+    urls = []
+    for _ in range(count):
+        host = rng.choice(HOSTS).format(domain=domain)
+        segments = [rng.choice(PATH_WORDS) + rng.choice(['', '-', '_']) + str(rng.randint(0, 99))
+                    for _ in range(rng.randint(0, 4))]
+        path = '/' + '/'.join(segments) + rng.choice(EXTENSIONS)
+        query = rng.choice(['', '?id=1', '?utm_source=x', '?ad=1', '?q=%E6%96%B0%E9%97%BB'])
+        urls.append(f"{rng.choice(['http', 'https'])}://{host}{path}{query}")
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description='链接评分基准')
+    parser.add_argument('--urls', type=int, default=100000, help='测试 url 数量')
+    parser.add_argument('--domain', default='example.com', help='网站域名')
+    args = parser.parse_args()
+
+    urls = build_urls(args.urls, args.domain)
+    detector = CriticalLinkDetector()
+
+    started = time.perf_counter()
+    expected = [detector.calculate_link_importance(url, original_domain=args.domain) for url in urls]
+    scalar_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scorer = BatchLinkScorer(detector.analyzer, args.domain)
+    scores = scorer.scores(urls)
+    batch_elapsed = time.perf_counter() - started
+
+    mismatches = int(np.count_nonzero(scores != np.array(expected)))
+    print(f"url 数量: {len(urls)}")
+    print(f"逐个评分: {scalar_elapsed:.2f}s ({len(urls) / scalar_elapsed:.0f} 个/秒)")
+    print(f"批量评分: {batch_elapsed:.2f}s ({len(urls) / batch_elapsed:.0f} 个/秒), "
+          f"加速 {scalar_elapsed / batch_elapsed:.1f} 倍")
+    print(f"结果不一致: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
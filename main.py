@@ -8,6 +8,9 @@ import time
 import os
 import chardet
 
+# 复用 keep-alive 连接的会话（下载与校验请求共用）
+session = requests.Session()
+
 input_url = ""
 result_dir = ""
 valid_link_path = ""
@@ -120,7 +123,7 @@ def screenshot_page(url):
 def safe_request(url, headers, timeout=2):
     """带异常处理的请求封装"""
     try:
-        response = requests.get(
+        response = session.get(
             url,
             headers=headers,
             timeout=timeout,
@@ -236,7 +239,7 @@ def download_all_content():
         print(link)
         save_path = download_path + re.sub(illegal_chars,'',link)
         try:
-            response = requests.get(link, stream=True, proxies=requests_proxies)  # 新增：代理
+            response = session.get(link, stream=True, proxies=requests_proxies)  # 新增：代理
             with open(save_path, 'wb') as file:
                 for chunk in response.iter_content(chunk_size=8192):
                     file.write(chunk)
@@ -244,7 +247,7 @@ def download_all_content():
                     success = success + 1.0
         except:
             try:
-                response = requests.get(link, proxies=requests_proxies)  # 新增：代理
+                response = session.get(link, proxies=requests_proxies)  # 新增：代理
                 with open(save_path, 'wb') as file:
                     file.write(response.text)
                     print(f"文件已下载到: {save_path}")
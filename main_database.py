@@ -12,6 +12,9 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
+# 复用 keep-alive 连接的会话（下载与校验请求共用）
+session = requests.Session()
+
 input_url = ""
 result_dir = ""
 valid_link_path = ""
@@ -54,11 +57,11 @@ def safe_soup(content):
 def safe_request(url, headers, timeout=2):
     """带异常处理的请求封装"""
     try:
-        response = requests.get(url,
-                                headers=headers,
-                                timeout=timeout,
-                                allow_redirects=True,
-                                verify=True)  # 验证SSL证书
+        response = session.get(url,
+                               headers=headers,
+                               timeout=timeout,
+                               allow_redirects=True,
+                               verify=True)  # 验证SSL证书
         response.raise_for_status()
         return response
     except requests.exceptions.HTTPError as e:
@@ -190,7 +193,7 @@ def download_all_content():
         print(link)
         save_path = download_path + re.sub(illegal_chars, '', link)
         try:
-            response = requests.get(link, stream=True)
+            response = session.get(link, stream=True)
             with open(save_path, 'wb') as file:
                 for chunk in response.iter_content(chunk_size=8192):
                     file.write(chunk)
@@ -209,7 +212,7 @@ def download_all_content():
                 )
         except:
             try:
-                response = requests.get(link)
+                response = session.get(link)
                 with open(save_path, 'wb') as file:
                     file.write(response.text)
                     print(f"文件已下载到: {save_path}")
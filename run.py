@@ -16,6 +16,16 @@ try:
 except Exception as e:
     print(f"启动调度器失败: {str(e)}")
 
+# 爬取任务由队列 worker 执行：默认在本进程内启动 worker 线程；
+# CRAWL_WORKER_MODE=external 时只负责入队，由独立的 worker.py 进程执行
+if os.getenv('CRAWL_WORKER_MODE', 'embedded') != 'external':
+    try:
+        from app.services.task_queue import CrawlWorker
+        CrawlWorker(threads=int(os.getenv('CRAWL_WORKER_THREADS', 2))).start()
+        print("内置爬取 worker 已启动")
+    except Exception as e:
+        print(f"启动爬取 worker 失败: {str(e)}")
+
 if __name__ == '__main__':
     # 获取配置
     host = os.getenv('FLASK_HOST', '0.0.0.0')
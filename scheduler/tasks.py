@@ -7,7 +7,6 @@ import logging
 from datetime import datetime
 
 from app.database import get_db
-from app.models import CrawlTaskModel
 
 logger = logging.getLogger(__name__)
 
@@ -29,14 +28,14 @@ def crawl_job(schedule_id, website_id, strategy):
 
         db = get_db()
 
-        # 检查是否有正在运行的任务
+        # 检查是否有排队中或正在运行的任务
         running_task = db.crawl_tasks.find_one({
             'website_id': website_id,
-            'status': 'running'
+            'status': {'$in': ['pending', 'running']}
         })
 
         if running_task:
-            logger.warning(f"网站 {website_id} 已有正在运行的任务，跳过本次执行")
+            logger.warning(f"网站 {website_id} 已有排队中或正在运行的任务，跳过本次执行")
             return
 
         # 获取网站信息
@@ -45,27 +44,17 @@ def crawl_job(schedule_id, website_id, strategy):
             logger.error(f"网站不存在: {website_id}")
             return
 
-        # 创建任务
-        task_doc = CrawlTaskModel.create(
-            website_id=website_id,
-            strategy=strategy,
-            task_type='scheduled'
+        # 加入任务队列，由 worker 认领执行
+        from app.services.task_queue import enqueue_task
+        task_doc = enqueue_task(
+            db, website_id, strategy,
+            task_type='scheduled',
+            engine=website.get('crawl_engine', 'recursive'),
+            depth=website.get('crawl_depth', 3),
+            max_links=website.get('max_links', 1000),
+            concurrency=website.get('crawl_concurrency', 20)
         )
-        result = db.crawl_tasks.insert_one(task_doc)
-        task_id = result.inserted_id
-
-        logger.info(f"创建爬取任务成功 - 任务ID: {task_id}")
-
-        # 调用爬虫服务执行爬取
-        try:
-            from app.services.crawler_service import CrawlerService
-            crawler = CrawlerService()
-            depth = website.get('crawl_depth', 3)
-            max_links = website.get('max_links', 1000)
-            crawler.crawl(task_id, website_id, strategy, depth, max_links)
-            logger.info(f"爬取任务执行成功 - 任务ID: {task_id}")
-        except Exception as e:
-            logger.error(f"爬取任务执行失败 - 任务ID: {task_id}, 错误: {str(e)}")
+        logger.info(f"爬取任务已加入队列 - 任务ID: {task_doc['_id']}")
 
         # 更新调度的最后运行时间
         from app.models import ScheduleModel
@@ -0,0 +1,66 @@
+"""
+抓取策略测试 - 瞬时状态码的判断与限流后的重试
+"""
+import io
+import time
+
+import requests
+
+from app.services.crawler_service import _request
+from app.services.fetch_policy import FetchPolicy, is_transient_status
+from app.services.host_scheduler import HostScheduler
+
+URL = 'https://example.com/page'
+
+
+def make_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = URL
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(b'')
+    return response
+
+
+def test_transient_status_codes():
+    assert is_transient_status(429)
+    assert is_transient_status(500)
+    assert is_transient_status(503)
+    assert not is_transient_status(404)
+    assert not is_transient_status(403)
+    assert not is_transient_status(None)
+
+
+def test_429_is_retried_after_scheduler_pause():
+    responses = [make_response(429, {'Retry-After': '1'}), make_response(200)]
+    sent = []
+
+    def send(timeout):
+        sent.append(time.monotonic())
+        return responses.pop(0)
+
+    policy = FetchPolicy(max_retries=2, backoff=0.01)
+    scheduler = HostScheduler(backoff=0.01)
+    response = _request(URL, send, scheduler=scheduler, policy=policy)
+
+    assert response is not None and response.status_code == 200
+    assert len(sent) == 2
+    # 重试在 Retry-After 指定的暂停结束后才发出
+    assert sent[1] - sent[0] >= 0.9
+    assert scheduler.stats()['throttled_responses'] == 1
+    assert policy.stats()['retries'] == 1
+
+
+def test_ssl_error_is_not_retried():
+    calls = []
+
+    def send(timeout):
+        calls.append(timeout)
+        raise requests.exceptions.SSLError('certificate verify failed')
+
+    policy = FetchPolicy(max_retries=2, backoff=0.01, breaker_threshold=1)
+    assert _request(URL, send, policy=policy) is None
+    assert len(calls) == 1
+    # 不计入熔断器的失败次数
+    assert policy.allow('example.com')
+    assert policy.stats()['retries'] == 0
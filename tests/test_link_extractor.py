@@ -0,0 +1,120 @@
+"""
+链接提取一致性测试 - 单次遍历提取与原先逐标签 find_all 扫描的结果一致
+"""
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from app.services.link_extractor import extract_links, extract_links_from_html
+
+BASE_URL = 'https://example.com/dir/page.html'
+
+FIXTURE_HTML = """<!DOCTYPE html>
+<html>
+<head>
+  <base href="https://cdn.example.org/assets/">
+  <link rel="stylesheet" href="/static/site.css">
+  <link rel="icon" href="  favicon.ico  ">
+  <script src="app.js"></script>
+  <script>var a = '<a href="/in-script">';</script>
+</head>
+<body>
+  <a href="/about">关于我们</a>
+  <a href="news/list.html?page=2#top">新闻</a>
+  <a href="">empty</a>
+  <a href="   ">whitespace</a>
+  <a>no href</a>
+  <A HREF="/Upper">upper</A>
+  <a href="https://other.example.net/x">external</a>
+  <a href="mailto:someone@example.com">mail</a>
+  <img src="img/a.png" srcset="img/a-1x.png 1x, img/a-2x.png 2x" data-src="lazy/a.png">
+  <img data-srcset="lazy/b-320.jpg 320w,lazy/b-640.jpg 640w, , " src="">
+  <img srcset="  ">
+  <picture>
+    <source srcset="img/c.webp" data-src="lazy/c.webp">
+    <source src="video/clip.mp4">
+  </picture>
+  <video src="video/v.mp4" poster="video/poster.jpg" data-src="lazy/v.mp4">
+    <track src="video/sub.vtt">
+  </video>
+  <audio data-src="audio/a.mp3"></audio>
+  <iframe src="//player.example.com/embed/1" data-src="lazy/frame.html"></iframe>
+  <embed src="flash/movie.swf">
+  <object data="objects/doc.pdf"></object>
+  <!-- <a href="/commented">commented</a> -->
+  <div data-src="not-checked.png"></div>
+</body>
+</html>
+"""
+
+
+def legacy_extract(html, base_url):
+    """原先 fetch_page_links 中的提取逻辑：每种标签各执行一次 find_all"""
+    soup = BeautifulSoup(html, 'lxml')
+    elements_to_check = {
+        'a': ['href'],
+        'img': ['src', 'srcset', 'data-src', 'data-srcset'],
+        'script': ['src'],
+        'link': ['href'],
+        'video': ['src', 'poster', 'data-src'],
+        'audio': ['src', 'data-src'],
+        'iframe': ['src', 'data-src'],
+        'source': ['src', 'srcset', 'data-src'],
+        'embed': ['src', 'data-src'],
+        'track': ['src'],
+        'object': ['data']
+    }
+
+    links = set()
+    for tag, attributes in elements_to_check.items():
+        for element in soup.find_all(tag):
+            for attr in attributes:
+                if element.has_attr(attr):
+                    value = element[attr].strip()
+                    if not value:
+                        continue
+
+                    if attr in ['srcset', 'data-srcset']:
+                        parts = [p.strip() for p in value.split(',') if p.strip()]
+                        for part in parts:
+                            url_part = part.split()[0]
+                            links.add(urljoin(base_url, url_part))
+                    else:
+                        links.add(urljoin(base_url, value))
+    return links
+
+
+def test_html_event_parser_matches_legacy_scan():
+    expected = legacy_extract(FIXTURE_HTML, BASE_URL)
+    links = {link for _, _, link in extract_links_from_html(FIXTURE_HTML, BASE_URL)}
+    assert links == expected
+
+
+def test_soup_single_pass_matches_legacy_scan():
+    expected = legacy_extract(FIXTURE_HTML, BASE_URL)
+    soup = BeautifulSoup(FIXTURE_HTML, 'lxml')
+    links = {link for _, _, link in extract_links(soup, BASE_URL)}
+    assert links == expected
+
+
+def test_fixture_covers_edge_cases():
+    links = {link for _, _, link in extract_links_from_html(FIXTURE_HTML, BASE_URL)}
+    # srcset / data-srcset 按逗号拆分并去掉描述符
+    assert 'https://example.com/dir/img/a-2x.png' in links
+    assert 'https://example.com/dir/lazy/b-640.jpg' in links
+    # 两侧空白被去掉，空值与纯空白值被跳过
+    assert 'https://example.com/dir/favicon.ico' in links
+    assert BASE_URL not in links
+    # 与原实现一致：<base> 不参与拼接，注释与脚本中的标签不提取
+    assert 'https://example.com/about' in links
+    assert not any(link.startswith('https://cdn.example.org/') for link in links)
+    assert 'https://example.com/in-script' not in links
+    assert 'https://example.com/commented' not in links
+
+
+def test_invalid_href_is_skipped_without_dropping_page():
+    html = '<a href="http://[bad/">bad</a><a href="/ok">ok</a><img srcset="http://[bad/ 1x, /ok2.png 2x">'
+    expected = {'https://example.com/ok', 'https://example.com/ok2.png'}
+    assert {link for _, _, link in extract_links_from_html(html, BASE_URL)} == expected
+    soup = BeautifulSoup(html, 'lxml')
+    assert {link for _, _, link in extract_links(soup, BASE_URL)} == expected
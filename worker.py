@@ -0,0 +1,32 @@
+"""
+爬取 worker 启动入口 - 从 MongoDB 任务队列认领并执行爬取任务
+
+可在多台主机上同时运行多个进程，例如:
+    python worker.py --threads 2
+"""
+import argparse
+import os
+
+from dotenv import load_dotenv
+
+from app.database import init_db
+from app.services.task_queue import CrawlWorker, QUEUE_POLL_INTERVAL
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬取任务 worker')
+    parser.add_argument('--threads', type=int, default=int(os.getenv('CRAWL_WORKER_THREADS', 2)),
+                        help='本进程同时执行的任务数')
+    parser.add_argument('--poll', type=float, default=QUEUE_POLL_INTERVAL,
+                        help='队列为空时的轮询间隔（秒）')
+    args = parser.parse_args()
+
+    init_db()
+    print(f"爬取 worker 已启动 (pid: {os.getpid()}, 线程数: {args.threads})")
+    CrawlWorker(threads=args.threads, poll_interval=args.poll).run_forever()
+    print("爬取 worker 已停止")
+
+
+if __name__ == '__main__':
+    load_dotenv()
+    main()